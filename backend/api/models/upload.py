@@ -3,7 +3,7 @@ Pydantic models for upload API endpoints.
 """
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class UploadResponse(BaseModel):
@@ -11,3 +11,15 @@ class UploadResponse(BaseModel):
     message: str
     chunks: Optional[int] = None
 
+
+class BatchUploadResult(BaseModel):
+    """Per-file result for the batch upload endpoint."""
+    filename: str
+    message: str
+    chunks: Optional[int] = None
+    success: bool
+
+
+class BatchUploadResponse(BaseModel):
+    """Response model for batch upload endpoint."""
+    results: List[BatchUploadResult]
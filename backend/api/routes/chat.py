@@ -2,11 +2,16 @@
 Chat API route handlers.
 """
 
+import json
 import uuid
 import logging
+from typing import Iterator, List, Tuple
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from langchain_core.documents import Document
 from backend.api.models.chat import ChatRequest, ChatResponse, SourceInfo
-from backend.services.rag_service import run_rag_pipeline
+from backend.services.rag_service import run_rag_pipeline, retrieve_context, stream_answer
 from backend.utils.chunking_strategy import get_chunking_strategy
 from rag_logging.rag_logger import log_rag_turn, create_log_record
 
@@ -17,17 +22,17 @@ logger = logging.getLogger(__name__)
 _conversation_turn_index: dict[str, int] = {}
 
 
-async def handle_chat(request: ChatRequest) -> ChatResponse:
-    """Chat endpoint handler that accepts questions and returns answers using RAG pipeline.
+def _start_turn(request: ChatRequest) -> Tuple[str, int, str]:
+    """Validate a chat request and resolve its conversation and turn index.
     
     Args:
         request: ChatRequest containing the question, optional conversation_id and turn_index
         
     Returns:
-        ChatResponse with answer and sources
+        Tuple of (conversation_id, turn_index, stripped user query)
         
     Raises:
-        HTTPException: If question is empty or RAG pipeline fails
+        HTTPException: If question is empty
     """
     # Validate question
     if not request.question or not request.question.strip():
@@ -52,77 +57,120 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
             _conversation_turn_index[conversation_id] += 1
         turn_index = _conversation_turn_index[conversation_id]
     
-    user_query = request.question.strip()
+    return conversation_id, turn_index, request.question.strip()
+
+
+def _collect_sources(context_docs: List[Document]) -> Tuple[List[str], List[SourceInfo]]:
+    """Extract context texts for logging and response sources from retrieved documents.
+    
+    Args:
+        context_docs: Documents returned by the RAG pipeline
+        
+    Returns:
+        Tuple of (context texts for the turn log, SourceInfo list for the response)
+    """
+    # Single pass over the documents for both lists
+    logger.info(f"Formatting sources from {len(context_docs)} context documents")
+    context_texts = []
+    sources = []
+    for doc in context_docs:
+        if not hasattr(doc, 'page_content'):
+            logger.warning(f"Document missing page_content attribute, skipping from context_texts")
+            continue
+        
+        page_content = doc.page_content
+        context_texts.append(page_content)
+        if not page_content:
+            continue
+        
+        try:
+            # Extract metadata safely
+            metadata = doc.metadata if hasattr(doc, 'metadata') else None
+            
+            # Ensure metadata is a dict or None
+            if metadata is not None and not isinstance(metadata, dict):
+                try:
+                    metadata = dict(metadata) if hasattr(metadata, 'items') else None
+                except Exception:
+                    metadata = None
+            
+            source_info = SourceInfo(
+                content=str(page_content),
+                metadata=metadata if isinstance(metadata, dict) else None
+            )
+            sources.append(source_info)
+            
+        except Exception as source_error:
+            # Log error but continue processing other sources
+            logger.error(f"Error creating source from document: {source_error}", exc_info=True)
+            continue
+    
+    return context_texts, sources
+
+
+def _log_turn(
+    conversation_id: str,
+    turn_index: int,
+    user_query: str,
+    answer: str,
+    context_docs: List[Document],
+    context_texts: List[str]
+) -> None:
+    """Log a RAG turn for offline evaluation (non-blocking, failure-tolerant).
+    
+    Args:
+        conversation_id: Unique conversation identifier
+        turn_index: Turn index within conversation
+        user_query: User's question
+        answer: Generated answer
+        context_docs: Retrieved documents (used to determine the chunking strategy)
+        context_texts: Retrieved chunk texts
+    """
+    try:
+        # Determine chunking strategy
+        chunking_strategy = get_chunking_strategy(context_docs)
+        
+        log_record = create_log_record(
+            conversation_id=conversation_id,
+            turn_index=turn_index,
+            user_query=user_query,
+            answer=answer,
+            contexts=context_texts,
+            chunking_strategy=chunking_strategy
+        )
+        log_rag_turn(log_record)
+    except Exception as log_error:
+        # Log error but don't break the request
+        logger.error(f"Failed to log RAG turn: {log_error}", exc_info=True)
+
+
+async def handle_chat(request: ChatRequest) -> ChatResponse:
+    """Chat endpoint handler that accepts questions and returns answers using RAG pipeline.
+    
+    Args:
+        request: ChatRequest containing the question, optional conversation_id and turn_index
+        
+    Returns:
+        ChatResponse with answer and sources
+        
+    Raises:
+        HTTPException: If question is empty or RAG pipeline fails
+    """
+    conversation_id, turn_index, user_query = _start_turn(request)
     
     try:
         # Run RAG pipeline with conversation_id for file filtering
-        response = run_rag_pipeline(user_query, conversation_id=conversation_id)
+        # The pipeline blocks on Chroma and Ollama, so it runs in the threadpool
+        # to keep the event loop free to serve other requests concurrently
+        response = await run_in_threadpool(run_rag_pipeline, user_query, conversation_id=conversation_id)
         
         # Extract answer and context
         # run_rag_pipeline guarantees context is always a list (never None)
         answer = response.get("answer", "")
         context_docs = response.get("context", [])
         
-        # Extract context texts for logging (with validation)
-        context_texts = []
-        for doc in context_docs:
-            if hasattr(doc, 'page_content'):
-                context_texts.append(doc.page_content)
-            else:
-                logger.warning(f"Document missing page_content attribute, skipping from context_texts")
-        
-        # Determine chunking strategy
-        chunking_strategy = get_chunking_strategy(context_docs)
-        
-        # Log RAG turn (non-blocking, failure-tolerant)
-        try:
-            log_record = create_log_record(
-                conversation_id=conversation_id,
-                turn_index=turn_index,
-                user_query=user_query,
-                answer=answer,
-                contexts=context_texts,
-                chunking_strategy=chunking_strategy
-            )
-            log_rag_turn(log_record)
-        except Exception as log_error:
-            # Log error but don't break the request
-            logger.error(f"Failed to log RAG turn: {log_error}", exc_info=True)
-        
-        # Format sources with validation
-        logger.info(f"Formatting sources from {len(context_docs)} context documents")
-        sources = []
-        for doc in context_docs:
-            try:
-                # Validate document structure before processing
-                if not hasattr(doc, 'page_content'):
-                    continue
-                
-                # Get page_content
-                page_content = doc.page_content
-                if not page_content:
-                    continue
-                
-                # Extract metadata safely
-                metadata = doc.metadata if hasattr(doc, 'metadata') else None
-                
-                # Ensure metadata is a dict or None
-                if metadata is not None and not isinstance(metadata, dict):
-                    try:
-                        metadata = dict(metadata) if hasattr(metadata, 'items') else None
-                    except Exception:
-                        metadata = None
-                
-                source_info = SourceInfo(
-                    content=str(page_content),
-                    metadata=metadata if isinstance(metadata, dict) else None
-                )
-                sources.append(source_info)
-                
-            except Exception as source_error:
-                # Log error but continue processing other sources
-                logger.error(f"Error creating source from document: {source_error}", exc_info=True)
-                continue
+        context_texts, sources = _collect_sources(context_docs)
+        _log_turn(conversation_id, turn_index, user_query, answer, context_docs, context_texts)
         
         logger.info(f"Returning response with {len(sources) if sources else 0} sources")
         return ChatResponse(
@@ -136,3 +184,54 @@ async def handle_chat(request: ChatRequest) -> ChatResponse:
             detail=f"Error processing question: {str(e)}"
         )
 
+
+async def handle_chat_stream(request: ChatRequest) -> StreamingResponse:
+    """Chat endpoint handler that streams the answer as it is generated.
+    
+    The response is newline-delimited JSON. The first event carries the
+    conversation ID and sources (known as soon as retrieval finishes), then
+    one event per answer delta, then a final "done" event. The turn is logged
+    once the full answer has been generated.
+    
+    Args:
+        request: ChatRequest containing the question, optional conversation_id and turn_index
+        
+    Returns:
+        StreamingResponse of NDJSON events
+        
+    Raises:
+        HTTPException: If question is empty or retrieval fails
+    """
+    conversation_id, turn_index, user_query = _start_turn(request)
+    
+    try:
+        context_docs, context = await run_in_threadpool(retrieve_context, user_query, conversation_id=conversation_id)
+        context_texts, sources = _collect_sources(context_docs)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing question: {str(e)}"
+        )
+    
+    def events() -> Iterator[str]:
+        yield json.dumps({
+            "type": "sources",
+            "conversation_id": conversation_id,
+            "sources": [source.model_dump() for source in sources] or None
+        }) + "\n"
+        
+        deltas = []
+        try:
+            for delta in stream_answer(context, user_query):
+                deltas.append(delta)
+                yield json.dumps({"type": "delta", "content": delta}) + "\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Error streaming answer: {e}", exc_info=True)
+            yield json.dumps({"type": "error", "detail": f"Error processing question: {str(e)}"}) + "\n"
+            return
+        
+        _log_turn(conversation_id, turn_index, user_query, "".join(deltas), context_docs, context_texts)
+        yield json.dumps({"type": "done"}) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
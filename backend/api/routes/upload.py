@@ -6,9 +6,62 @@ import os
 import re
 import tempfile
 from fastapi import HTTPException, UploadFile, File, Form
-from typing import Optional
-from backend.api.models.upload import UploadResponse
-from backend.services.document_service import process_and_index_file
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+from backend.api.models.upload import UploadResponse, BatchUploadResult, BatchUploadResponse
+from backend.services.document_service import process_and_index_file, process_and_index_files
+
+SUPPORTED_EXTENSIONS = [".pdf", ".txt", ".docx", ".doc", ".xlsx", ".xls"]
+
+
+def _extract_chunk_count(result_message: str) -> Optional[int]:
+    """Extract number of chunks from a result message like "indexed 5 chunks".
+    
+    Args:
+        result_message: Status message returned by the document service
+    
+    Returns:
+        Number of chunks, or None if the message does not contain a count
+    """
+    if "indexed" in result_message.lower():
+        match = re.search(r'indexed\s+(\d+)\s+chunks?', result_message, re.IGNORECASE)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def _validate_extension(filename: Optional[str]) -> str:
+    """Validate the file extension of an uploaded file.
+    
+    Args:
+        filename: Uploaded filename
+    
+    Returns:
+        Lowercased file extension
+    
+    Raises:
+        HTTPException: If the file type is not supported
+    """
+    file_ext = os.path.splitext(filename or "")[1].lower()
+    
+    if file_ext not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type: {file_ext}. Supported types: {', '.join(SUPPORTED_EXTENSIONS)}"
+        )
+    
+    return file_ext
+
+
+def _remove_temp_files(paths: List[str]) -> None:
+    """Remove temporary files, ignoring errors during cleanup."""
+    for path in paths:
+        if path and os.path.exists(path):
+            try:
+                os.unlink(path)
+            except Exception:
+                # Ignore errors during cleanup
+                pass
 
 
 async def handle_upload(
@@ -35,14 +88,7 @@ async def handle_upload(
         )
     
     # Validate file extension
-    file_ext = os.path.splitext(file.filename or "")[1].lower()
-    supported_extensions = [".pdf", ".txt", ".docx", ".doc", ".xlsx", ".xls"]
-    
-    if file_ext not in supported_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type: {file_ext}. Supported types: {', '.join(supported_extensions)}"
-        )
+    file_ext = _validate_extension(file.filename)
     
     # Extract original filename at upload time
     original_filename = file.filename
@@ -67,18 +113,13 @@ async def handle_upload(
         
         # Process and index the file (pass original filename from upload)
         result_message = process_and_index_file(
-            temp_file_path, 
+            temp_file_path,
             conversation_id=conversation_id,
             original_filename=original_filename
         )
         
         # Extract number of chunks from result message if available
-        chunks = None
-        if "indexed" in result_message.lower():
-            # Try to extract chunk count from message like "indexed 5 chunks"
-            match = re.search(r'indexed\s+(\d+)\s+chunks?', result_message, re.IGNORECASE)
-            if match:
-                chunks = int(match.group(1))
+        chunks = _extract_chunk_count(result_message)
         
         # Check if processing was successful
         if result_message.startswith("Error"):
@@ -102,10 +143,85 @@ async def handle_upload(
         )
     finally:
         # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-            except Exception:
-                # Ignore errors during cleanup
-                pass
+        _remove_temp_files([temp_file_path])
 
+
+async def handle_upload_batch(
+    files: List[UploadFile] = File(...),
+    conversation_id: Optional[str] = Form(None)
+) -> BatchUploadResponse:
+    """Batch upload endpoint handler that processes and indexes several files at once.
+    
+    Files are loaded and chunked concurrently; per-file failures are reported in
+    the response instead of failing the whole request.
+    
+    Args:
+        files: Uploaded files (PDF, TXT, DOCX, DOC, XLSX, or XLS)
+        conversation_id: Optional conversation ID to associate the files with a chat session
+    
+    Returns:
+        BatchUploadResponse with one result per uploaded file
+    
+    Raises:
+        HTTPException: If no files are provided, a file type is unsupported, or processing fails
+    """
+    if not files:
+        raise HTTPException(
+            status_code=400,
+            detail="No files provided"
+        )
+    
+    # Validate all extensions before writing anything to disk
+    file_exts = [_validate_extension(file.filename) for file in files]
+    
+    temp_file_paths: List[str] = []
+    try:
+        original_filenames = []
+        for file, file_ext in zip(files, file_exts):
+            file_content = await file.read()
+            
+            if not file_content:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"File is empty: {file.filename}"
+                )
+            
+            # Create temporary file with original extension
+            # (Necessary for document loaders which require a file path)
+            with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
+                temp_file.write(file_content)
+                temp_file_paths.append(temp_file.name)
+            original_filenames.append(file.filename)
+        
+        # Loading, embedding and indexing the batch blocks for a long time, so it
+        # runs in the threadpool to keep the event loop serving other requests
+        result_messages = await run_in_threadpool(
+            process_and_index_files,
+            temp_file_paths,
+            conversation_id=conversation_id,
+            original_filenames=original_filenames
+        )
+        
+        return BatchUploadResponse(
+            results=[
+                BatchUploadResult(
+                    filename=filename or "",
+                    message=message,
+                    chunks=_extract_chunk_count(message),
+                    success=not message.startswith("Error")
+                )
+                for filename, message in zip(original_filenames, result_messages)
+            ]
+        )
+    
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing files: {str(e)}"
+        )
+    finally:
+        # Clean up temporary files
+        _remove_temp_files(temp_file_paths)
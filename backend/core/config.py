@@ -5,6 +5,7 @@ Centralizes all configuration values used across the application.
 
 # RAG pipeline configuration
 TOP_K = 5  # Number of documents to retrieve
+RETRIEVAL_CACHE_SIZE = 512  # Number of recent similarity searches kept in memory
 
 # Model configuration
 EMBEDDING_MODEL = "qwen3-embedding:0.6b"
@@ -12,6 +13,13 @@ EMBEDDING_MODEL = "qwen3-embedding:0.6b"
 LLM_MODEL = "deepseek-r1:1.5b"
 LLM_KEEP_ALIVE = "2h"
 LLM_TEMPERATURE = 0
+EMBEDDING_KEEP_ALIVE = "2h"
+
+# Ollama HTTP client configuration
+# The embedding and LLM singletons each keep one HTTP client whose connections
+# stay open between calls; these limits size that keep-alive pool.
+OLLAMA_MAX_CONNECTIONS = 32
+OLLAMA_MAX_KEEPALIVE_CONNECTIONS = 16
 
 # System prompt configuration
 SYSTEM_PROMPT = (
@@ -58,9 +66,32 @@ SYSTEM_PROMPT = (
 VECTOR_DB_COLLECTION_NAME = "documents"
 VECTOR_DB_PATH = "./db/chroma_db"
 
+# HNSW index settings applied when the collection is created. Cosine distance
+# suits text embeddings; larger M / ef values trade a little memory and build
+# time for higher recall. Existing collections keep the settings they were
+# created with until they are cleared (see scripts/clear_chroma_db.py).
+# Chroma's hnswlib index stores float32 vectors only (no int8/scalar
+# quantization), so memory per chunk is 4 bytes x embedding dimension plus
+# roughly 2*M graph links; M is the knob that trades index size for recall.
+VECTOR_DB_COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+}
+
 # Chunking configuration (for non-Docling files)
-CHUNK_SIZE = 1000
-CHUNK_OVERLAP = 100
+# Sizes are in tokens so chunks fill, but stay under, the embedding model's
+# ~512-token input limit regardless of how many bytes each character takes
+CHUNK_SIZE = 480
+CHUNK_OVERLAP = 64
+CHUNK_TOKEN_ENCODING = "cl100k_base"  # tiktoken encoding used to count tokens
+# tiktoken downloads the encoding on first use; keeping it in a project-local
+# cache directory means one online run is enough for later offline use
+TIKTOKEN_CACHE_DIR = ".cache/tiktoken"
+# Character-based sizes used instead when the tiktoken encoding is unavailable
+FALLBACK_CHUNK_SIZE = 1000
+FALLBACK_CHUNK_OVERLAP = 100
 
 # Supabase configuration for document registry
 import os
@@ -75,3 +106,26 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 
+
+# Ingestion concurrency configuration
+# Number of workers used to load and chunk files in parallel when several files
+# are uploaded together. Defaults to one less than the number of CPUs.
+INGEST_WORKERS = int(os.getenv("RAG_INGEST_WORKERS", "0")) or max((os.cpu_count() or 2) - 1, 1)
+
+# Run batch loading/chunking in worker processes instead of threads. Processes
+# sidestep the GIL for CPU-heavy parsing (OCR, layout models) at the cost of
+# loading the Docling models once per worker process.
+INGEST_USE_PROCESSES = os.getenv("RAG_INGEST_PROCESSES", "false").lower() == "true"
+
+# Number of chunks sent to the vector database per add_documents call when
+# indexing several files together
+INDEX_BATCH_SIZE = 128
+
+# Number of chunk texts sent to the embedding model per embed_documents call
+EMBED_BATCH_SIZE = 64
+
+# On-disk cache of loaded and chunked files, keyed by content hash and chunking
+# configuration; the least recently used entries beyond the limit are evicted
+CHUNK_CACHE_ENABLED = os.getenv("RAG_CHUNK_CACHE", "true").lower() == "true"
+CHUNK_CACHE_DIR = os.getenv("RAG_CHUNK_CACHE_DIR", ".cache/chunks")
+CHUNK_CACHE_MAX_ENTRIES = 1000
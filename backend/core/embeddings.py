@@ -2,13 +2,42 @@
 Embedding model initialization and management.
 """
 
+import httpx
 from langchain_ollama import OllamaEmbeddings
-from backend.core.config import EMBEDDING_MODEL
+from backend.core.config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_KEEP_ALIVE,
+    OLLAMA_MAX_CONNECTIONS,
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+)
 
 # Global embedding instance
 _embeddings = None
 
 
+def create_embeddings() -> OllamaEmbeddings:
+    """Create a new embedding model instance with its own HTTP clients.
+    
+    Most callers should use the shared get_embeddings() instance. A separate
+    instance is needed when async calls run on several event loops, because
+    the async HTTP client is bound to the loop it is first used on.
+    
+    Returns:
+        OllamaEmbeddings instance
+    """
+    return OllamaEmbeddings(
+        model=EMBEDDING_MODEL,
+        keep_alive=EMBEDDING_KEEP_ALIVE,
+        # Reuse pooled keep-alive connections across embedding calls
+        client_kwargs={
+            "limits": httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+            )
+        },
+    )
+
+
 def get_embeddings() -> OllamaEmbeddings:
     """Initialize and return embedding model instance.
     
@@ -20,7 +49,7 @@ def get_embeddings() -> OllamaEmbeddings:
     global _embeddings
     
     if _embeddings is None:
-        _embeddings = OllamaEmbeddings(model=EMBEDDING_MODEL)
+        _embeddings = create_embeddings()
     
     return _embeddings
 
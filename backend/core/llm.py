@@ -2,8 +2,15 @@
 LLM initialization and management.
 """
 
+import httpx
 from langchain_ollama import ChatOllama
-from backend.core.config import LLM_MODEL, LLM_KEEP_ALIVE, LLM_TEMPERATURE
+from backend.core.config import (
+    LLM_MODEL,
+    LLM_KEEP_ALIVE,
+    LLM_TEMPERATURE,
+    OLLAMA_MAX_CONNECTIONS,
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+)
 
 # Global LLM instance
 _llm = None
@@ -23,7 +30,14 @@ def get_llm() -> ChatOllama:
         _llm = ChatOllama(
             model=LLM_MODEL,
             keep_alive=LLM_KEEP_ALIVE,
-            temperature=LLM_TEMPERATURE
+            temperature=LLM_TEMPERATURE,
+            # Reuse pooled keep-alive connections across LLM calls
+            client_kwargs={
+                "limits": httpx.Limits(
+                    max_connections=OLLAMA_MAX_CONNECTIONS,
+                    max_keepalive_connections=OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+                )
+            },
         )
     
     return _llm
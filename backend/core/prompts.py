@@ -2,30 +2,45 @@
 Prompt template management for RAG pipeline.
 """
 
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, SystemMessagePromptTemplate
 from backend.core.config import SYSTEM_PROMPT
 
+# Human message template shared by the prompt template and the fast formatter
+RAG_HUMAN_TEMPLATE = (
+    "Context:\n"
+    "---------------------\n"
+    "{context}\n"
+    "---------------------\n"
+    "Question: {input}"
+)
+
 # RAG prompt template with system message
 RAG_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
     ("system", SYSTEM_PROMPT),
-    ("human", 
-     "Context:\n"
-     "---------------------\n"
-     "{context}\n"
-     "---------------------\n"
-     "Question: {input}")
+    ("human", RAG_HUMAN_TEMPLATE)
 ])
 
+# System message has no variables, so it is rendered once and reused
+_SYSTEM_MESSAGE = SystemMessagePromptTemplate.from_template(SYSTEM_PROMPT).format()
+
 
 def format_rag_prompt(context: str, question: str):
     """Format RAG prompt with context and question.
     
+    Produces the same messages as RAG_PROMPT_TEMPLATE.format_messages, but
+    reuses the pre-rendered system message and fills the human message with a
+    single str.format call instead of going through the template machinery
+    on every query.
+    
     Args:
         context: Retrieved context documents formatted as string
         question: User's question
-        
+    
     Returns:
         Formatted prompt messages ready for LLM
     """
-    return RAG_PROMPT_TEMPLATE.format_messages(context=context, input=question)
-
+    return [
+        _SYSTEM_MESSAGE,
+        HumanMessage(content=RAG_HUMAN_TEMPLATE.format(context=context, input=question))
+    ]
@@ -3,14 +3,80 @@ Retrieval logic with conversation filtering.
 """
 
 import logging
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from langchain_core.documents import Document
-from backend.core.config import TOP_K
+from backend.core.config import RETRIEVAL_CACHE_SIZE, TOP_K
 from backend.core.vectorstore import get_vectorstore
 
 logger = logging.getLogger(__name__)
 
 
+def normalize_query(question: str) -> str:
+    """Normalize a question for use as a retrieval cache key.
+    
+    Collapses runs of whitespace and strips leading/trailing whitespace, so
+    trivially different spellings of the same question share a cache entry.
+    
+    Args:
+        question: User question
+        
+    Returns:
+        Normalized question
+    """
+    return " ".join(question.split())
+
+
+# Bumped by reset_retrieval_cache and part of every cache key. A search that
+# started before a reset stores its result under the old generation, so it can
+# never be served after the reset even if it finishes afterwards.
+_cache_generation = 0
+
+
+@lru_cache(maxsize=RETRIEVAL_CACHE_SIZE)
+def _cached_similarity_search(query: str, k: int, generation: int) -> Tuple[Document, ...]:
+    """Run a similarity search, memoizing results per cache generation.
+    
+    Results are cached as a tuple so the cached value can't be mutated by
+    callers. generation only takes part in the cache key.
+    
+    Args:
+        query: Normalized question
+        k: Number of documents to retrieve
+        generation: Cache generation at the time the search started
+        
+    Returns:
+        Tuple of retrieved Document objects
+    """
+    vectordb = get_vectorstore()
+    docs = vectordb.similarity_search(query, k=k)
+    return tuple(docs) if docs is not None else ()
+
+
+def _similarity_search(query: str, k: int) -> Tuple[Document, ...]:
+    """Run a similarity search, served from the cache for repeated queries.
+    
+    The cache key includes the cache generation, which is bumped whenever this
+    process changes the collection (see reset_retrieval_cache).
+    
+    Args:
+        query: Normalized question
+        k: Number of documents to retrieve
+        
+    Returns:
+        Tuple of retrieved Document objects
+    """
+    # Read the generation before the search starts (see _cache_generation)
+    return _cached_similarity_search(query, k, _cache_generation)
+
+
+def reset_retrieval_cache() -> None:
+    """Invalidate cached similarity search results (call after the collection changes)."""
+    global _cache_generation
+    _cache_generation += 1
+    _cached_similarity_search.cache_clear()
+
+
 def retrieve_documents(
     question: str,
     conversation_id: Optional[str] = None,
@@ -40,24 +106,17 @@ def retrieve_documents(
         logger.info("No conversation_id provided - returning empty list (documents only accessible in their upload chat)")
         return []
     
-    vectordb = get_vectorstore()
-    
     # Use similarity_search directly instead of retriever to ensure fresh embeddings
     # Retrieve more documents to account for conversation filtering
     # This ensures we have enough candidates after filtering by conversation_id
     retrieve_count = k * 2
     
-    logger.info(f"Performing similarity search for question: '{question[:50]}...' with conversation_id: {conversation_id}, k={retrieve_count}")
-    docs = vectordb.similarity_search(question, k=retrieve_count)
-    
-    # Ensure docs is a list (defensive check)
-    if docs is None:
-        docs = []
-        logger.warning("similarity_search returned None, using empty list")
-    elif not isinstance(docs, list):
-        # Convert to list if it's not already
-        docs = list(docs) if hasattr(docs, '__iter__') else []
-        logger.warning(f"similarity_search returned non-list type: {type(docs)}, converted to list")
+    logger.info(
+        "Performing similarity search for question: '%.50s...' with conversation_id: %s, k=%d",
+        question, conversation_id, retrieve_count
+    )
+    # Repeated questions are served from the in-memory cache without re-embedding
+    docs = list(_similarity_search(normalize_query(question), retrieve_count))
     
     # Validate document structure - ensure all items are Document objects with page_content
     valid_docs = []
@@ -4,8 +4,10 @@ Vector database initialization and management.
 
 import logging
 from typing import Dict, Optional
+import chromadb
+from chromadb.api import ClientAPI
 from langchain_chroma import Chroma
-from backend.core.config import VECTOR_DB_COLLECTION_NAME, VECTOR_DB_PATH
+from backend.core.config import VECTOR_DB_COLLECTION_METADATA, VECTOR_DB_COLLECTION_NAME, VECTOR_DB_PATH
 from backend.core.embeddings import get_embeddings
 
 logger = logging.getLogger(__name__)
@@ -30,15 +32,46 @@ def get_vectorstore() -> Chroma:
             collection_name=VECTOR_DB_COLLECTION_NAME,
             embedding_function=embeddings,
             persist_directory=VECTOR_DB_PATH,
+            collection_metadata=VECTOR_DB_COLLECTION_METADATA,
         )
+        
+        # HNSW settings only take effect when the collection is created
+        existing_space = (_vectordb._collection.metadata or {}).get("hnsw:space", "l2")
+        if existing_space != VECTOR_DB_COLLECTION_METADATA["hnsw:space"]:
+            logger.warning(
+                f"Collection '{VECTOR_DB_COLLECTION_NAME}' uses hnsw:space={existing_space}; "
+                f"run scripts/clear_chroma_db.py and re-index to apply the configured HNSW settings"
+            )
     
     return _vectordb
 
 
+def get_chroma_client() -> ClientAPI:
+    """Return the raw Chroma client for the persist directory.
+    
+    Reuses the vectorstore's client if one exists; otherwise opens the
+    persistent client directly, without creating the embedding model. Useful
+    for maintenance tasks (e.g. clearing data) that never embed anything.
+    
+    Returns:
+        Chroma client instance
+    """
+    if _vectordb is not None:
+        return _vectordb._client
+    return chromadb.PersistentClient(path=VECTOR_DB_PATH)
+
+
 def reset_vectorstore() -> None:
-    """Reset the global vectorstore instance (useful for testing)."""
+    """Reset the global vectorstore instance (useful for testing).
+    
+    Also invalidates cached retrieval results, which belong to the old instance.
+    """
+    # Imported here because the retriever imports this module
+    from backend.core.retriever import reset_retrieval_cache
+    
     global _vectordb
     _vectordb = None
+    reset_retrieval_cache()
 
 
 def delete_documents_by_metadata(filter_dict: Dict) -> int:
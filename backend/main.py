@@ -27,11 +27,12 @@ from backend.config.logging_config import setup_logging
 setup_logging()
 
 from fastapi import FastAPI, UploadFile, File, Form
-from typing import Dict, Optional
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Optional
 from backend.api.routes import chat, upload
 from backend.api.middleware import setup_cors
 from backend.api.models.chat import ChatRequest, ChatResponse
-from backend.api.models.upload import UploadResponse
+from backend.api.models.upload import UploadResponse, BatchUploadResponse
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -60,6 +61,12 @@ async def chat_endpoint(request: ChatRequest) -> ChatResponse:
     return await chat.handle_chat(request)
 
 
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest) -> StreamingResponse:
+    """Chat endpoint that streams the answer as newline-delimited JSON events."""
+    return await chat.handle_chat_stream(request)
+
+
 @app.post("/api/upload", response_model=UploadResponse)
 async def upload_endpoint(
     file: UploadFile = File(...),
@@ -69,6 +76,15 @@ async def upload_endpoint(
     return await upload.handle_upload(file, conversation_id)
 
 
+@app.post("/api/upload/batch", response_model=BatchUploadResponse)
+async def upload_batch_endpoint(
+    files: List[UploadFile] = File(...),
+    conversation_id: Optional[str] = Form(None)
+) -> BatchUploadResponse:
+    """Batch upload endpoint that processes and indexes several files concurrently."""
+    return await upload.handle_upload_batch(files, conversation_id)
+
+
 if __name__ == "__main__":
     import uvicorn
     # Run the app directly (app is already imported above)
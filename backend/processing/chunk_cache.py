@@ -0,0 +1,196 @@
+"""
+On-disk cache of loaded and chunked documents.
+
+Parsing a large PDF with Docling takes seconds to tens of seconds. Chunks are
+cached by file content hash and a fingerprint of the chunking configuration,
+so re-indexing an unchanged file (e.g. after clearing the vector database)
+skips loading and chunking entirely.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import threading
+from importlib import metadata
+from typing import List, Optional
+from langchain_core.documents import Document
+from backend.core.config import (
+    CHUNK_CACHE_DIR,
+    CHUNK_CACHE_ENABLED,
+    CHUNK_CACHE_MAX_ENTRIES,
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    CHUNK_TOKEN_ENCODING,
+)
+from backend.processing.loaders import OCR_TEXT_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Bump when the loading/chunking code changes in a way that changes its output
+CHUNK_CACHE_FORMAT_VERSION = 3
+
+# Number of cache entries, counted once per process and then tracked as entries
+# are added, so the directory is only scanned when a store may have pushed the
+# cache over CHUNK_CACHE_MAX_ENTRIES (None until first counted)
+_entry_count: Optional[int] = None
+_entry_count_lock = threading.Lock()
+
+
+def _package_version(name: str) -> str:
+    """Return an installed package version, or an empty string if unavailable."""
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+# Everything besides file content that determines the chunks of a file
+_CONFIG_FINGERPRINT = hashlib.sha256(repr((
+    CHUNK_CACHE_FORMAT_VERSION,
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    CHUNK_TOKEN_ENCODING,
+    OCR_TEXT_THRESHOLD,
+    _package_version("docling"),
+    _package_version("langchain-text-splitters"),
+)).encode("utf-8")).hexdigest()
+
+
+def _cache_path(content_hash: str, file_ext: str) -> str:
+    """Build the cache file path for a file's content and type."""
+    key = hashlib.sha256(f"{content_hash}|{file_ext}|{_CONFIG_FINGERPRINT}".encode("utf-8")).hexdigest()
+    return os.path.join(CHUNK_CACHE_DIR, f"{key}.pkl")
+
+
+def get_cached_chunks(content_hash: str, file_ext: str, file_path: str) -> Optional[List[Document]]:
+    """Return cached chunks for a file, if present.
+    
+    The "source" metadata of cached chunks points at the path the file had when
+    it was first chunked (often a temporary upload path), so it is rewritten to
+    the current path.
+    
+    Args:
+        content_hash: SHA256 hash of the file content
+        file_ext: Lowercased file extension
+        file_path: Current path of the file
+    
+    Returns:
+        List of Document chunks, or None on a miss (or if caching is disabled)
+    """
+    if not CHUNK_CACHE_ENABLED:
+        return None
+    
+    path = _cache_path(content_hash, file_ext)
+    try:
+        with open(path, "rb") as f:
+            chunks = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable chunk cache entry {path}: {e}")
+        return None
+    
+    # Mark the entry as recently used for eviction
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    
+    for chunk in chunks:
+        if "source" in chunk.metadata:
+            chunk.metadata["source"] = file_path
+    
+    logger.info(f"Loaded {len(chunks)} cached chunks for hash {content_hash[:16]}...")
+    return chunks
+
+
+def store_chunks(content_hash: str, file_ext: str, chunks: List[Document]) -> None:
+    """Store the chunks of a file in the cache (best effort).
+    
+    The entry is written atomically. If it is a new entry that takes the cache
+    over CHUNK_CACHE_MAX_ENTRIES, the least recently used entries are evicted.
+    
+    Args:
+        content_hash: SHA256 hash of the file content
+        file_ext: Lowercased file extension
+        chunks: Document chunks produced for the file
+    """
+    if not CHUNK_CACHE_ENABLED:
+        return
+    
+    path = _cache_path(content_hash, file_ext)
+    # Unique per process and thread, so concurrent ingest workers storing the
+    # same content never write to the same temporary file
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(CHUNK_CACHE_DIR, exist_ok=True)
+        with open(temp_path, "wb") as f:
+            pickle.dump(chunks, f, protocol=pickle.HIGHEST_PROTOCOL)
+        is_new_entry = not os.path.exists(path)
+        os.replace(temp_path, path)
+        if is_new_entry:
+            _record_new_entry()
+    except Exception as e:
+        logger.warning(f"Failed to write chunk cache entry {path}: {e}")
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def _record_new_entry() -> None:
+    """Count a newly added cache entry and evict old entries if over the limit."""
+    global _entry_count
+    
+    with _entry_count_lock:
+        if _entry_count is None:
+            # First store in this process: count the entries (including the new one)
+            with os.scandir(CHUNK_CACHE_DIR) as entries:
+                _entry_count = sum(1 for entry in entries if entry.name.endswith(".pkl"))
+        else:
+            _entry_count += 1
+        
+        if _entry_count > CHUNK_CACHE_MAX_ENTRIES:
+            _entry_count = _evict_least_recently_used()
+
+
+def _evict_least_recently_used() -> int:
+    """Delete the oldest cache entries beyond CHUNK_CACHE_MAX_ENTRIES.
+    
+    The directory is rescanned, which also corrects the tracked entry count
+    for entries added or removed by other processes.
+    
+    Returns:
+        Number of entries left in the cache
+    """
+    with os.scandir(CHUNK_CACHE_DIR) as entries:
+        cache_files = [
+            (entry.stat().st_mtime, entry.path)
+            for entry in entries
+            if entry.name.endswith(".pkl")
+        ]
+    
+    excess = len(cache_files) - CHUNK_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return len(cache_files)
+    
+    cache_files.sort()
+    removed = 0
+    for _, path in cache_files[:excess]:
+        try:
+            os.unlink(path)
+            removed += 1
+        except OSError:
+            pass
+    return len(cache_files) - removed
+
+
+def reset_chunk_cache() -> None:
+    """Delete every cached chunk list."""
+    global _entry_count
+    
+    with _entry_count_lock:
+        shutil.rmtree(CHUNK_CACHE_DIR, ignore_errors=True)
+        _entry_count = None
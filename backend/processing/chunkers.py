@@ -2,10 +2,111 @@
 Chunking strategies for different document types.
 """
 
-from typing import List
+import logging
+import os
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-from backend.core.config import CHUNK_SIZE, CHUNK_OVERLAP
+from backend.core.config import (
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    CHUNK_TOKEN_ENCODING,
+    FALLBACK_CHUNK_OVERLAP,
+    FALLBACK_CHUNK_SIZE,
+    TIKTOKEN_CACHE_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+# File types that use DoclingLoader are already chunked via ExportType.DOC_CHUNKS
+DOCLING_CHUNKED_EXTENSIONS = frozenset({".pdf", ".docx", ".doc", ".xlsx", ".xls"})
+
+# Chunking strategy identifiers stored in the "chunking_strategy" metadata of
+# non-Docling chunks, so logs report how each indexed chunk was actually split
+TOKEN_CHUNKING_STRATEGY = f"token_{CHUNK_SIZE}_overlap_{CHUNK_OVERLAP}"
+CHARACTER_CHUNKING_STRATEGY = f"fixed_{FALLBACK_CHUNK_SIZE}_overlap_{FALLBACK_CHUNK_OVERLAP}"
+
+
+# Number of recently measured text pieces whose token counts are memoized
+TOKEN_LENGTH_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=1)
+def get_text_splitter() -> Tuple[RecursiveCharacterTextSplitter, str]:
+    """Return the shared text splitter for non-Docling files and its strategy id.
+    
+    Splits on paragraph/sentence boundaries but measures chunk size in
+    tokens rather than characters. Built once, since loading the tiktoken
+    encoding is the expensive part.
+    
+    Token counts come from tiktoken's native encode_ordinary (no special-token
+    scan) and are memoized, because the splitter measures each piece once when
+    splitting and again when merging pieces into chunks.
+    
+    tiktoken downloads the encoding on first use (cached in TIKTOKEN_CACHE_DIR
+    unless the environment sets another location). If it can't be loaded,
+    e.g. offline before the first download, the character-sized splitter is
+    used instead for the rest of the process.
+    
+    Returns:
+        Tuple of (RecursiveCharacterTextSplitter instance, chunking strategy id)
+    """
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", TIKTOKEN_CACHE_DIR)
+    try:
+        import tiktoken
+        
+        encode = tiktoken.get_encoding(CHUNK_TOKEN_ENCODING).encode_ordinary
+    except Exception as e:
+        logger.warning(
+            f"Could not load tiktoken encoding {CHUNK_TOKEN_ENCODING} ({e}); "
+            f"splitting text files by characters instead"
+        )
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=FALLBACK_CHUNK_SIZE,
+            chunk_overlap=FALLBACK_CHUNK_OVERLAP,
+            length_function=len,
+            add_start_index=True
+        )
+        return splitter, CHARACTER_CHUNKING_STRATEGY
+    
+    @lru_cache(maxsize=TOKEN_LENGTH_CACHE_SIZE)
+    def token_length(text: str) -> int:
+        return len(encode(text))
+    
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        length_function=token_length,
+        add_start_index=True
+    )
+    return splitter, TOKEN_CHUNKING_STRATEGY
+
+
+def _as_single_chunk(document: Document) -> Optional[List[Document]]:
+    """Return a document as its own single chunk if it is too small to split.
+    
+    Every token covers at least one UTF-8 byte, so a text of at most CHUNK_SIZE
+    bytes can never exceed CHUNK_SIZE tokens (nor the larger character-based
+    fallback size). Such texts skip the splitter and produce the same single
+    chunk it would (whitespace-stripped, with start_index).
+    
+    Args:
+        document: Document to check
+        
+    Returns:
+        List with zero or one chunk, or None if the document needs splitting
+    """
+    text = document.page_content
+    if len(text) > CHUNK_SIZE or len(text.encode("utf-8")) > CHUNK_SIZE:
+        return None
+    
+    stripped = text.strip()
+    if not stripped:
+        return []
+    start_index = len(text) - len(text.lstrip())
+    metadata = {**document.metadata, "start_index": start_index, "chunking_strategy": TOKEN_CHUNKING_STRATEGY}
+    return [Document(page_content=stripped, metadata=metadata)]
 
 
 def process_documents_for_chunking(
@@ -25,20 +126,20 @@ def process_documents_for_chunking(
     Returns:
         List of processed Document chunks
     """
-    # File types that use DoclingLoader are already chunked via ExportType.DOC_CHUNKS
-    docling_supported = [".pdf", ".docx", ".doc", ".xlsx", ".xls"]
-    
-    if file_ext in docling_supported:
+    if file_ext in DOCLING_CHUNKED_EXTENSIONS:
         # Documents are already chunked by DoclingLoader with HybridChunker
         return documents
     
-    # For non-Docling files (e.g., TXT), use standard text splitting
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-        length_function=len,
-        add_start_index=True
-    )
-    chunks = text_splitter.split_documents(documents)
+    # For non-Docling files (e.g., TXT), use the shared token-based splitter;
+    # documents that fit in one chunk bypass it
+    chunks = []
+    for document in documents:
+        single = _as_single_chunk(document)
+        if single is None:
+            splitter, strategy = get_text_splitter()
+            single = splitter.split_documents([document])
+            for chunk in single:
+                chunk.metadata["chunking_strategy"] = strategy
+        chunks.extend(single)
     return chunks
 
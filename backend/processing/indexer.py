@@ -4,12 +4,18 @@ Indexing logic for adding documents to vector database.
 
 import os
 import json
+import hashlib
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Union
 from langchain_core.documents import Document
+from backend.core.config import EMBED_BATCH_SIZE
+from backend.core.embeddings import get_embeddings
+from backend.core.retriever import reset_retrieval_cache
 from backend.core.vectorstore import get_vectorstore, delete_documents_by_metadata
-from backend.utils.metadata import clean_metadata_for_chromadb
+from backend.utils.chunk_ids import chunk_id_prefix
+from backend.utils.metadata import clean_metadata_for_chromadb, extract_docling_location
+from backend.utils.timestamps import to_isoformat, utc_now_iso
 
 logger = logging.getLogger(__name__)
 
@@ -28,17 +34,10 @@ def generate_chunk_ids(base_filename: str, num_chunks: int, content_hash: Option
     Returns:
         List of chunk IDs in format: {filename}_{hash}_{i} or {filename}_{i} if no hash
     """
-    # Sanitize filename to ensure valid ID format
-    safe_filename = "".join(c if c.isalnum() or c in ('_', '-', '.') else '_' for c in base_filename)
-    
     # Include content hash prefix to ensure uniqueness across different files
-    # Use first 8 characters of hash for brevity while maintaining uniqueness
-    if content_hash:
-        hash_prefix = content_hash[:8]
-        return [f"{safe_filename}_{hash_prefix}_{i}" for i in range(num_chunks)]
-    else:
-        # Fallback to original format if hash not provided (backward compatibility)
-        return [f"{safe_filename}_{i}" for i in range(num_chunks)]
+    # Falls back to {filename}_{i} if hash not provided (backward compatibility)
+    prefix = chunk_id_prefix(base_filename, content_hash)
+    return [prefix + str(i) for i in range(num_chunks)]
 
 
 def prepare_chunks_for_indexing(
@@ -47,8 +46,8 @@ def prepare_chunks_for_indexing(
     original_filename: Optional[str] = None,
     file_path: Optional[str] = None,
     content_hash: Optional[str] = None,
-    upload_timestamp: Optional[datetime] = None,
-    last_indexed_timestamp: Optional[datetime] = None
+    upload_timestamp: Optional[Union[datetime, str]] = None,
+    last_indexed_timestamp: Optional[Union[datetime, str]] = None
 ) -> List[Document]:
     """Prepare document chunks for indexing by cleaning metadata.
     
@@ -58,8 +57,8 @@ def prepare_chunks_for_indexing(
         original_filename: Original filename from upload
         file_path: Path to the source file
         content_hash: SHA256 hash of file content (for de-duplication)
-        upload_timestamp: Timestamp when file was uploaded
-        last_indexed_timestamp: Timestamp when file was last indexed
+        upload_timestamp: Timestamp (datetime or ISO string) when file was uploaded
+        last_indexed_timestamp: Timestamp (datetime or ISO string) when file was last indexed
         
     Returns:
         List of Document chunks with cleaned metadata
@@ -73,15 +72,24 @@ def prepare_chunks_for_indexing(
         base_filename = "unknown"
     
     # Use current time if timestamps not provided
-    now = datetime.utcnow()
-    upload_ts = (upload_timestamp or now).isoformat()
-    indexed_ts = (last_indexed_timestamp or now).isoformat()
+    # Timestamps are formatted once here and the same string is shared by every chunk
+    now_iso = utc_now_iso() if upload_timestamp is None or last_indexed_timestamp is None else None
+    upload_ts = to_isoformat(upload_timestamp or now_iso)
+    indexed_ts = to_isoformat(last_indexed_timestamp or now_iso)
     
     # Clean and prepare metadata for each chunk
     for chunk in chunks:
         # Clean metadata for ChromaDB compatibility
         cleaned_metadata = clean_metadata_for_chromadb(chunk.metadata)
         
+        # Flatten Docling location into plain fields once at ingest, so readers
+        # don't need to parse the dl_meta JSON (kept for backward compatibility)
+        dl_meta = chunk.metadata.get("dl_meta")
+        if isinstance(dl_meta, dict):
+            location = extract_docling_location(dl_meta)
+            cleaned_metadata["dl_section"] = location.section
+            cleaned_metadata["dl_page_no"] = location.page_no
+        
         # Ensure source and filename are present
         if "source" not in cleaned_metadata:
             cleaned_metadata["source"] = file_path or ""
@@ -130,6 +138,7 @@ def delete_document_chunks(filename: str, content_hash: Optional[str] = None) ->
     
     try:
         deleted_count = delete_documents_by_metadata(filter_dict)
+        reset_retrieval_cache()
         logger.info(f"Deleted {deleted_count} chunks for document: {filename} (hash: {content_hash[:16] if content_hash else 'N/A'}...)")
         return deleted_count
     except Exception as e:
@@ -143,6 +152,11 @@ def index_documents(
 ) -> None:
     """Add document chunks to vector database.
     
+    Chunks with identical text (repeated headers/footers, overlapping windows)
+    are embedded only once. Unique texts are embedded in batches of
+    EMBED_BATCH_SIZE with a single embed_documents call per batch, and the
+    precomputed vectors are written directly to the underlying Chroma collection.
+    
     Args:
         chunks: List of Document chunks to index
         chunk_ids: List of IDs for the chunks (must match chunks length)
@@ -155,6 +169,38 @@ def index_documents(
     if vectordb is None:
         raise RuntimeError("Vector database not initialized")
     
-    # Add to vector database with custom IDs
-    vectordb.add_documents(documents=chunks, ids=chunk_ids)
-
+    # Map each chunk to the index of its text among the unique texts
+    texts = [chunk.page_content for chunk in chunks]
+    unique_index = {}
+    unique_texts = []
+    text_slots = []
+    for text in texts:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        slot = unique_index.get(digest)
+        if slot is None:
+            slot = unique_index[digest] = len(unique_texts)
+            unique_texts.append(text)
+        text_slots.append(slot)
+    
+    if len(unique_texts) < len(texts):
+        logger.info(f"Embedding {len(unique_texts)} unique texts for {len(texts)} chunks")
+    
+    embeddings = get_embeddings()
+    unique_vectors = []
+    for start in range(0, len(unique_texts), EMBED_BATCH_SIZE):
+        unique_vectors.extend(embeddings.embed_documents(unique_texts[start:start + EMBED_BATCH_SIZE]))
+    
+    collection = vectordb._collection
+    for start in range(0, len(chunks), EMBED_BATCH_SIZE):
+        end = start + EMBED_BATCH_SIZE
+        
+        # Add to vector database with custom IDs (upsert, as Chroma.add_documents does)
+        collection.upsert(
+            ids=chunk_ids[start:end],
+            embeddings=[unique_vectors[slot] for slot in text_slots[start:end]],
+            documents=texts[start:end],
+            metadatas=[chunk.metadata for chunk in chunks[start:end]],
+        )
+    
+    # Cached similarity searches may now miss the new chunks
+    reset_retrieval_cache()
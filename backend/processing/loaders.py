@@ -2,11 +2,205 @@
 Document loaders for different file types.
 """
 
-from typing import List
-from langchain_community.document_loaders import TextLoader
+import os
+import logging
+import threading
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, TypeVar
 from langchain_core.documents import Document
-from langchain_docling import DoclingLoader
-from langchain_docling.loader import ExportType
+
+# Docling (and the torch models it pulls in) and pypdfium2 are imported inside
+# the functions that use them, so importing this module - and starting the API
+# server - stays fast until the first document is actually parsed
+if TYPE_CHECKING:
+    from docling.chunking import HybridChunker
+    from docling.document_converter import DocumentConverter
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# PDFs with a sampled page yielding fewer extracted characters than this are
+# treated as (partly) scanned and parsed with OCR; text-native PDFs skip the
+# OCR model entirely
+OCR_TEXT_THRESHOLD = 50
+
+
+def _ocr_sample_pages(page_count: int) -> List[int]:
+    """Return the indices of the pages checked for a text layer.
+    
+    Samples the first, middle and last pages, so a scanned appendix or a
+    text-native cover page on an otherwise scanned document is still noticed.
+    
+    Args:
+        page_count: Number of pages in the PDF
+        
+    Returns:
+        Sorted, distinct page indices
+    """
+    return sorted({0, page_count // 2, page_count - 1})
+
+
+def _pdf_needs_ocr(file_path: str) -> bool:
+    """Check whether a PDF needs OCR by peeking at the text layer of sampled pages.
+    
+    Args:
+        file_path: Path to the PDF file
+        
+    Returns:
+        True if any sampled page has (almost) no extractable text
+    """
+    import pypdfium2
+    
+    try:
+        pdf = pypdfium2.PdfDocument(file_path)
+        try:
+            page_count = len(pdf)
+            if page_count == 0:
+                return False
+            for index in _ocr_sample_pages(page_count):
+                text = pdf[index].get_textpage().get_text_range()
+                if len(text.strip()) < OCR_TEXT_THRESHOLD:
+                    return True
+        finally:
+            pdf.close()
+    except Exception as e:
+        # If the text layer can't be read, let Docling OCR the document
+        logger.warning(f"Could not inspect PDF text layer of {file_path}: {e}")
+        return True
+    return False
+
+
+def _per_thread_cache(factory: Callable[..., _T]) -> Callable[..., _T]:
+    """Cache a factory's result per argument tuple and per thread.
+    
+    Docling's conversion pipelines and the Hugging Face fast tokenizer inside
+    HybridChunker are not safe to use from several threads at once (the
+    tokenizer raises "Already borrowed"). Ingest worker threads therefore each
+    build and reuse their own instances instead of sharing process-wide ones.
+    
+    Args:
+        factory: Function building the instance from hashable arguments
+        
+    Returns:
+        Wrapped function returning the calling thread's cached instance
+    """
+    local = threading.local()
+    
+    @wraps(factory)
+    def wrapper(*args: Any) -> _T:
+        cache = getattr(local, "cache", None)
+        if cache is None:
+            cache = local.cache = {}
+        if args not in cache:
+            cache[args] = factory(*args)
+        return cache[args]
+    
+    return wrapper
+
+
+@_per_thread_cache
+def _get_pdf_converter(do_ocr: bool) -> "DocumentConverter":
+    """Return the Docling converter tuned for fast PDF parsing.
+    
+    Uses the fast TableFormer mode, runs OCR only when requested, and lets the
+    layout/table models use all but one CPU core. One converter is built per
+    OCR setting per thread and reused, so its pipeline and models are
+    initialized once per ingest worker instead of once per file.
+    
+    Args:
+        do_ocr: Whether to run OCR on page images
+        
+    Returns:
+        DocumentConverter for PDF input
+    """
+    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.pipeline_options import PdfPipelineOptions, TableFormerMode
+    from docling.document_converter import DocumentConverter, PdfFormatOption
+    
+    try:
+        from docling.datamodel.accelerator_options import AcceleratorOptions
+    except ImportError:
+        # Older Docling releases define AcceleratorOptions next to the pipeline options
+        from docling.datamodel.pipeline_options import AcceleratorOptions
+    
+    pipeline_options = PdfPipelineOptions(do_ocr=do_ocr, do_table_structure=True)
+    pipeline_options.table_structure_options.mode = TableFormerMode.FAST
+    pipeline_options.accelerator_options = AcceleratorOptions(
+        num_threads=max((os.cpu_count() or 2) - 1, 1)
+    )
+    return DocumentConverter(
+        format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+    )
+
+
+@_per_thread_cache
+def _get_default_converter() -> "DocumentConverter":
+    """Return this thread's Docling converter with default options (non-PDF formats)."""
+    from docling.document_converter import DocumentConverter
+    
+    return DocumentConverter()
+
+
+@_per_thread_cache
+def _get_hybrid_chunker() -> "HybridChunker":
+    """Return this thread's HybridChunker, so its tokenizer is loaded only once per thread.
+    
+    Uses the same defaults DoclingLoader applies when no chunker is given.
+    """
+    from docling.chunking import HybridChunker
+    
+    return HybridChunker()
+
+
+def _load_with_docling(file_path: str, converter: Optional["DocumentConverter"] = None) -> List[Document]:
+    """Load a file with DoclingLoader, chunked by HybridChunker (ExportType.DOC_CHUNKS).
+    
+    Args:
+        file_path: Path to the file to load
+        converter: Optional custom Docling converter (default converter if None)
+        
+    Returns:
+        List of chunked Document objects
+    """
+    from langchain_docling import DoclingLoader
+    from langchain_docling.loader import ExportType
+    
+    loader = DoclingLoader(
+        file_path=file_path,
+        converter=converter or _get_default_converter(),
+        chunker=_get_hybrid_chunker(),
+        export_type=ExportType.DOC_CHUNKS  # Preserves structure with semantic chunking
+    )
+    return loader.load()
+
+
+def _load_pdf(file_path: str) -> List[Document]:
+    """Load a PDF with the fast Docling pipeline (OCR only for scanned files)."""
+    return _load_with_docling(file_path, _get_pdf_converter(_pdf_needs_ocr(file_path)))
+
+
+def _load_text(file_path: str) -> List[Document]:
+    """Load a plain-text file as a single Document (Docling may not support plain text).
+    
+    Reads the file directly, with the same result as LangChain's TextLoader
+    (page_content plus a "source" metadata entry) but always decoding UTF-8.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    return [Document(page_content=text, metadata={"source": file_path})]
+
+
+# Loader for each supported file extension. Docling-supported types other than
+# PDF use Docling's default converter.
+LOADERS: Dict[str, Callable[[str], List[Document]]] = {
+    ".pdf": _load_pdf,
+    ".docx": _load_with_docling,
+    ".doc": _load_with_docling,
+    ".xlsx": _load_with_docling,
+    ".xls": _load_with_docling,
+    ".txt": _load_text,
+}
 
 
 def load_document(file_path: str, file_ext: str) -> List[Document]:
@@ -25,24 +219,11 @@ def load_document(file_path: str, file_ext: str) -> List[Document]:
     Raises:
         ValueError: If file type is not supported
     """
-    # File types supported by DoclingLoader (use ExportType.DOC_CHUNKS for consistent chunking)
-    docling_supported = [".pdf", ".docx", ".doc", ".xlsx", ".xls"]
-    
-    if file_ext in docling_supported:
-        loader = DoclingLoader(
-            file_path=file_path,
-            export_type=ExportType.DOC_CHUNKS  # Preserves structure with semantic chunking
-        )
-        documents = loader.load()
-    elif file_ext == ".txt":
-        # TXT files: fallback to TextLoader (Docling may not support plain text)
-        loader = TextLoader(file_path)
-        documents = loader.load()
-    else:
+    loader = LOADERS.get(file_ext)
+    if loader is None:
         raise ValueError(
             f"Unsupported file type: {file_ext}. "
-            f"Supported types: .pdf, .txt, .docx, .doc, .xlsx, .xls"
+            f"Supported types: {', '.join(LOADERS)}"
         )
     
-    return documents
-
+    return loader(file_path)
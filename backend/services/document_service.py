@@ -4,27 +4,268 @@ Document processing service - Orchestrates document loading, chunking, and index
 
 import os
 import logging
-from datetime import datetime
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from langchain_core.documents import Document
+from backend.core.config import INGEST_WORKERS, INGEST_USE_PROCESSES, INDEX_BATCH_SIZE
 from backend.processing.loaders import load_document
 from backend.processing.chunkers import process_documents_for_chunking
+from backend.processing.chunk_cache import get_cached_chunks, store_chunks
 from backend.processing.indexer import (
     generate_chunk_ids,
     prepare_chunks_for_indexing,
     index_documents,
     delete_document_chunks
 )
-from backend.utils.file_utils import compute_file_hash, get_file_size
+from backend.utils.file_utils import compute_file_hash
+from backend.utils.timestamps import utc_now_iso
 from backend.utils.document_registry import (
-    get_document_by_hash,
-    get_document_by_filename,
+    get_documents_by_hash_or_filename,
     register_document,
+    register_documents,
     update_document,
     delete_document
 )
 
 logger = logging.getLogger(__name__)
 
+# File types loaded with DoclingLoader (already chunked by HybridChunker)
+DOCLING_SUPPORTED = [".pdf", ".docx", ".doc", ".xlsx", ".xls"]
+
+
+def _check_registry(base_filename: str, content_hash: str) -> Tuple[bool, Optional[str]]:
+    """Look up a document in the registry to detect duplicates and updates.
+    
+    Registry errors are logged and swallowed so indexing still works when
+    Supabase is unavailable (duplicate detection is disabled in that case).
+    
+    Args:
+        base_filename: Base filename of the document
+        content_hash: SHA256 hash of the file content
+    
+    Returns:
+        Tuple of (is_duplicate, old_hash). old_hash is set when a document with
+        the same filename but different content is already registered.
+    """
+    old_hash = None
+    try:
+        # Single round-trip: fetch rows matching either the hash or the filename
+        existing_docs = get_documents_by_hash_or_filename(content_hash, base_filename)
+        
+        if any(doc["content_hash"] == content_hash for doc in existing_docs):
+            # Same content hash = exact duplicate, skip processing
+            logger.info(f"Document with hash {content_hash[:16]}... already indexed, skipping")
+            return True, None
+        
+        # Remaining rows share the filename but have a different hash (update scenario)
+        for doc in existing_docs:
+            if doc["filename"] == base_filename:
+                old_hash = doc["content_hash"]
+                logger.info(f"Found existing document '{base_filename}' with different hash, will update")
+                break
+    except RuntimeError as rls_error:
+        # RLS or Supabase connection error - log but continue with indexing
+        # This allows graceful degradation: indexing works even if registry is unavailable
+        error_msg = str(rls_error).lower()
+        if "row-level security" in error_msg or "policy" in error_msg or "access denied" in error_msg:
+            logger.warning(
+                f"RLS policy error accessing registry for {base_filename}. "
+                f"Continuing with indexing (duplicate detection disabled). Error: {str(rls_error)}"
+            )
+        else:
+            logger.warning(
+                f"Supabase registry unavailable for {base_filename}. "
+                f"Continuing with indexing (duplicate detection disabled). Error: {str(rls_error)}"
+            )
+    except Exception as registry_error:
+        # Any other registry error - log but continue
+        logger.warning(
+            f"Registry error for {base_filename}. "
+            f"Continuing with indexing (duplicate detection disabled). Error: {str(registry_error)}"
+        )
+    
+    return False, old_hash
+
+
+def _remove_previous_version(base_filename: str, old_hash: str) -> None:
+    """Delete old chunks and the old registry entry for an updated document.
+    
+    Both deletions are best-effort: failures are logged and re-indexing continues.
+    
+    Args:
+        base_filename: Base filename of the document
+        old_hash: Content hash of the previously indexed version
+    """
+    # Delete old chunks from ChromaDB (best-effort, continue even if fails)
+    try:
+        logger.info(f"Deleting old chunks for document: {base_filename}")
+        deleted_count = delete_document_chunks(base_filename, old_hash)
+        logger.info(f"Deleted {deleted_count} old chunks")
+    except Exception as chunk_delete_error:
+        # Log but continue - system should attempt re-indexing despite deletion failure
+        # This implements the best-effort approach: new chunks will be indexed even if
+        # old chunks couldn't be deleted (may result in duplicates, but system doesn't crash)
+        logger.warning(
+            f"Failed to delete old chunks for document {base_filename} (hash: {old_hash[:16]}...): {str(chunk_delete_error)}. "
+            f"Continuing with re-indexing (may result in duplicate chunks)."
+        )
+    
+    # Delete old registry entry to prevent orphaned records (best-effort)
+    try:
+        delete_document(old_hash)
+        logger.info(f"Deleted old registry entry for hash: {old_hash[:16]}...")
+    except Exception as registry_delete_error:
+        # Log but continue - old chunks deletion may have succeeded, new document will be registered
+        logger.warning(
+            f"Failed to delete old registry entry for hash {old_hash[:16]}...: {str(registry_delete_error)}. "
+            f"Continuing with new document registration."
+        )
+
+
+def _load_and_chunk(file_path: str, file_ext: str, content_hash: str) -> List[Document]:
+    """Load a document and split it into chunks, reusing cached chunks if present.
+    
+    This step is pure local computation (no network calls), so it is safe to
+    run concurrently for several files.
+    
+    Args:
+        file_path: Path to the file to load
+        file_ext: Lowercased file extension
+        content_hash: SHA256 hash of the file content (chunk cache key)
+    
+    Returns:
+        List of Document chunks
+    """
+    chunks = get_cached_chunks(content_hash, file_ext, file_path)
+    if chunks is not None:
+        return chunks
+    
+    documents = load_document(file_path, file_ext)
+    chunks = process_documents_for_chunking(documents, file_ext)
+    store_chunks(content_hash, file_ext, chunks)
+    return chunks
+
+
+def _register_or_update(
+    base_filename: str,
+    content_hash: str,
+    file_size: int,
+    chunk_count: int,
+    conversation_id: Optional[str],
+    now_iso: str
+) -> None:
+    """Register a document in the registry, falling back to an update (best effort).
+    
+    Args:
+        base_filename: Base filename of the document
+        content_hash: SHA256 hash of the file content
+        file_size: File size in bytes
+        chunk_count: Number of indexed chunks
+        conversation_id: Optional conversation ID to associate the file with
+        now_iso: ISO timestamp used for the chunk metadata
+    """
+    # Use the same timestamps as chunk metadata to ensure consistency
+    try:
+        # Try to register new document with timestamps matching chunk metadata
+        register_document(
+            filename=base_filename,
+            content_hash=content_hash,
+            file_size=file_size,
+            chunk_count=chunk_count,
+            conversation_id=conversation_id,
+            upload_timestamp=now_iso,
+            last_indexed_timestamp=now_iso
+        )
+    except Exception as reg_error:
+        # If registration fails (e.g., unique constraint), try update instead
+        logger.warning(f"Registration failed, attempting update: {str(reg_error)}")
+        try:
+            # Pass last_indexed timestamp to ensure consistency with chunk metadata
+            update_document(
+                content_hash=content_hash,
+                chunk_count=chunk_count,
+                last_indexed=now_iso
+            )
+        except Exception as update_error:
+            logger.error(f"Failed to update document in registry: {str(update_error)}")
+            # Continue even if registry update fails (best effort)
+
+
+def _build_status(base_filename: str, file_ext: str, chunk_count: int, is_update: bool) -> str:
+    """Build the status message for a successfully indexed document.
+    
+    Args:
+        base_filename: Base filename of the document
+        file_ext: Lowercased file extension
+        chunk_count: Number of indexed chunks
+        is_update: Whether this replaced a previously indexed version
+    
+    Returns:
+        Status message describing the result
+    """
+    if is_update:
+        status = f"Successfully updated and re-indexed {chunk_count} chunks from {base_filename}"
+    else:
+        status = f"Successfully uploaded and indexed {chunk_count} chunks from {base_filename}"
+    
+    # All DoclingLoader files are processed and ready for chat
+    if file_ext in DOCLING_SUPPORTED:
+        status += "\n(Processed document ready for chat)"
+    
+    return status
+
+
+def _index_and_register(
+    chunks: List[Document],
+    file_path: str,
+    file_ext: str,
+    base_filename: str,
+    content_hash: str,
+    file_size: int,
+    conversation_id: Optional[str],
+    original_filename: Optional[str],
+    is_update: bool
+) -> str:
+    """Index chunks in the vector database and record the document in the registry.
+    
+    Args:
+        chunks: Document chunks produced by _load_and_chunk
+        file_path: Path to the source file
+        file_ext: Lowercased file extension
+        base_filename: Base filename of the document
+        content_hash: SHA256 hash of the file content
+        file_size: File size in bytes
+        conversation_id: Optional conversation ID to associate the file with
+        original_filename: Original filename from upload
+        is_update: Whether this replaces a previously indexed version
+    
+    Returns:
+        Status message describing the result
+    """
+    # Generate chunk IDs (include content_hash to prevent collisions)
+    chunk_ids = generate_chunk_ids(base_filename, len(chunks), content_hash=content_hash)
+    
+    # Prepare chunks for indexing with tracking metadata
+    # Format the timestamp once and share it between chunk metadata and registry
+    now_iso = utc_now_iso()
+    chunks = prepare_chunks_for_indexing(
+        chunks,
+        conversation_id=conversation_id,
+        original_filename=original_filename,
+        file_path=file_path,
+        content_hash=content_hash,
+        upload_timestamp=now_iso,
+        last_indexed_timestamp=now_iso
+    )
+    
+    # Index documents in vector database
+    index_documents(chunks, chunk_ids)
+    
+    # Register or update document in registry
+    _register_or_update(base_filename, content_hash, file_size, len(chunks), conversation_id, now_iso)
+    
+    return _build_status(base_filename, file_ext, len(chunks), is_update)
+
 
 def process_and_index_file(
     file_path: str,
@@ -55,154 +296,200 @@ def process_and_index_file(
     
     try:
         # Determine base filename
-        if original_filename:
-            base_filename = os.path.basename(original_filename)
-        else:
-            base_filename = os.path.basename(file_path)
+        base_filename = os.path.basename(original_filename or file_path)
         
         # Step 0: Compute file hash and size (before processing)
         logger.info(f"Computing hash for file: {base_filename}")
         logger.info(f"Conversation ID for this upload: {conversation_id}")
-        content_hash = compute_file_hash(file_path)
-        file_size = get_file_size(file_path)
+        # Stat once and reuse the size for hashing and the registry
+        file_size = os.stat(file_path).st_size
+        content_hash = compute_file_hash(file_path, file_size=file_size)
         
-        # Check registry for existing document by hash
-        # Wrap in try-except to handle Supabase/RLS errors gracefully
-        existing_doc = None
-        old_hash = None
-        try:
-            existing_doc = get_document_by_hash(content_hash)
-            
-            if existing_doc:
-                # Same content hash = exact duplicate, skip processing
-                logger.info(f"Document with hash {content_hash[:16]}... already indexed, skipping")
-                return f"Document '{base_filename}' already indexed (duplicate content detected)."
-            
-            # Check if document with same filename exists but different hash (update scenario)
-            existing_by_filename = get_document_by_filename(base_filename)
-            
-            if existing_by_filename:
-                # Find document with same filename but different hash
-                for doc in existing_by_filename:
-                    if doc["content_hash"] != content_hash:
-                        old_hash = doc["content_hash"]
-                        logger.info(f"Found existing document '{base_filename}' with different hash, will update")
-                        break
-        except RuntimeError as rls_error:
-            # RLS or Supabase connection error - log but continue with indexing
-            # This allows graceful degradation: indexing works even if registry is unavailable
-            error_msg = str(rls_error).lower()
-            if "row-level security" in error_msg or "policy" in error_msg or "access denied" in error_msg:
-                logger.warning(
-                    f"RLS policy error accessing registry for {base_filename}. "
-                    f"Continuing with indexing (duplicate detection disabled). Error: {str(rls_error)}"
-                )
-            else:
-                logger.warning(
-                    f"Supabase registry unavailable for {base_filename}. "
-                    f"Continuing with indexing (duplicate detection disabled). Error: {str(rls_error)}"
-                )
-        except Exception as registry_error:
-            # Any other registry error - log but continue
-            logger.warning(
-                f"Registry error for {base_filename}. "
-                f"Continuing with indexing (duplicate detection disabled). Error: {str(registry_error)}"
-            )
+        # Check registry for existing document by hash / filename
+        is_duplicate, old_hash = _check_registry(base_filename, content_hash)
+        if is_duplicate:
+            return f"Document '{base_filename}' already indexed (duplicate content detected)."
         
         # If update scenario, delete old chunks and old registry entry
         if old_hash:
-            # Delete old chunks from ChromaDB (best-effort, continue even if fails)
-            try:
-                logger.info(f"Deleting old chunks for document: {base_filename}")
-                deleted_count = delete_document_chunks(base_filename, old_hash)
-                logger.info(f"Deleted {deleted_count} old chunks")
-            except Exception as chunk_delete_error:
-                # Log but continue - system should attempt re-indexing despite deletion failure
-                # This implements the best-effort approach: new chunks will be indexed even if
-                # old chunks couldn't be deleted (may result in duplicates, but system doesn't crash)
-                logger.warning(
-                    f"Failed to delete old chunks for document {base_filename} (hash: {old_hash[:16]}...): {str(chunk_delete_error)}. "
-                    f"Continuing with re-indexing (may result in duplicate chunks)."
-                )
+            _remove_previous_version(base_filename, old_hash)
             
-            # Delete old registry entry to prevent orphaned records (best-effort)
-            try:
-                delete_document(old_hash)
-                logger.info(f"Deleted old registry entry for hash: {old_hash[:16]}...")
-            except Exception as registry_delete_error:
-                # Log but continue - old chunks deletion may have succeeded, new document will be registered
-                logger.warning(
-                    f"Failed to delete old registry entry for hash {old_hash[:16]}...: {str(registry_delete_error)}. "
-                    f"Continuing with new document registration."
-                )
-        
-        # Extract file extension
+        # Steps 1-2: Load and chunk document
         file_ext = os.path.splitext(file_path)[1].lower()
+        chunks = _load_and_chunk(file_path, file_ext, content_hash)
         
-        # Step 1: Load document
-        documents = load_document(file_path, file_ext)
-        
-        # Step 2: Process documents for chunking
-        chunks = process_documents_for_chunking(documents, file_ext)
-        
-        # Step 3: Generate chunk IDs (include content_hash to prevent collisions)
-        chunk_ids = generate_chunk_ids(base_filename, len(chunks), content_hash=content_hash)
-        
-        # Step 4: Prepare chunks for indexing with tracking metadata
-        now = datetime.utcnow()
-        chunks = prepare_chunks_for_indexing(
+        # Steps 3-6: Index chunks and register document
+        return _index_and_register(
             chunks,
-            conversation_id=conversation_id,
-            original_filename=original_filename,
             file_path=file_path,
+            file_ext=file_ext,
+            base_filename=base_filename,
             content_hash=content_hash,
-            upload_timestamp=now,
-            last_indexed_timestamp=now
+            file_size=file_size,
+            conversation_id=conversation_id,
+            original_filename=original_filename,
+            is_update=bool(old_hash)
         )
+    except Exception as e:
+        logger.error(f"Error processing file {file_path}: {str(e)}", exc_info=True)
+        return f"Error processing file: {str(e)}"
+
+
+def process_and_index_files(
+    file_paths: List[str],
+    conversation_id: Optional[str] = None,
+    original_filenames: Optional[List[Optional[str]]] = None
+) -> List[str]:
+    """Process several uploaded files and add them to the vector database.
+    
+    Runs the same pipeline as process_and_index_file, but loads and chunks the
+    files concurrently with INGEST_WORKERS workers. Threads are used by default
+    (Docling parsing releases the GIL and threads share the loaded models);
+    with INGEST_USE_PROCESSES the files are parsed in separate processes. Chunks of all files are then
+    indexed together in batches of INDEX_BATCH_SIZE and the documents are
+    registered with a single registry insert. Registry and ChromaDB calls stay
+    serial in the calling thread.
+    
+    Args:
+        file_paths: Paths to the uploaded files (may be temporary)
+        conversation_id: Optional conversation ID to associate the files with a chat session
+        original_filenames: Optional original filenames from upload, aligned with file_paths
+    
+    Returns:
+        List of status messages, one per input file (same order as file_paths)
+    """
+    if original_filenames is None:
+        original_filenames = [None] * len(file_paths)
+    
+    statuses: List[Optional[str]] = [None] * len(file_paths)
+    pending = []
+    seen_hashes = set()
+    
+    # Phase 1: hash files and check the registry (network-bound, serial)
+    for i, (file_path, original_filename) in enumerate(zip(file_paths, original_filenames)):
+        if not file_path:
+            statuses[i] = "Error: No file provided."
+            continue
         
-        # Step 5: Index documents in vector database
-        index_documents(chunks, chunk_ids)
-        
-        # Step 6: Register or update document in registry
-        # Use the same timestamps as chunk metadata to ensure consistency
         try:
-            # Try to register new document with timestamps matching chunk metadata
-            register_document(
-                filename=base_filename,
-                content_hash=content_hash,
-                file_size=file_size,
-                chunk_count=len(chunks),
-                conversation_id=conversation_id,
-                upload_timestamp=now,
-                last_indexed_timestamp=now
-            )
-        except Exception as reg_error:
-            # If registration fails (e.g., unique constraint), try update instead
-            logger.warning(f"Registration failed, attempting update: {str(reg_error)}")
+            base_filename = os.path.basename(original_filename or file_path)
+            logger.info(f"Computing hash for file: {base_filename}")
+            file_size = os.stat(file_path).st_size
+            content_hash = compute_file_hash(file_path, file_size=file_size)
+            
+            # Files with identical content in the same batch are duplicates too
+            if content_hash in seen_hashes:
+                statuses[i] = f"Document '{base_filename}' already indexed (duplicate content detected)."
+                continue
+            
+            is_duplicate, old_hash = _check_registry(base_filename, content_hash)
+            if is_duplicate:
+                statuses[i] = f"Document '{base_filename}' already indexed (duplicate content detected)."
+                continue
+            
+            seen_hashes.add(content_hash)
+            file_ext = os.path.splitext(file_path)[1].lower()
+            pending.append((i, file_path, file_ext, base_filename, content_hash, file_size, original_filename, old_hash))
+        except Exception as e:
+            logger.error(f"Error processing file {file_path}: {str(e)}", exc_info=True)
+            statuses[i] = f"Error processing file: {str(e)}"
+    
+    if not pending:
+        return statuses
+    
+    # Phase 2: load and chunk all pending files concurrently (local CPU work only)
+    logger.info(f"Conversation ID for this upload: {conversation_id}")
+    max_workers = min(INGEST_WORKERS, len(pending))
+    executor_class = ProcessPoolExecutor if INGEST_USE_PROCESSES else ThreadPoolExecutor
+    logger.info(
+        f"Loading and chunking {len(pending)} files with {max_workers} "
+        f"{'processes' if INGEST_USE_PROCESSES else 'threads'}"
+    )
+    now_iso = utc_now_iso()
+    all_chunks: List[Document] = []
+    all_chunk_ids: List[str] = []
+    staged = []  # (job, start, end) ranges into all_chunks / all_chunk_ids
+    with executor_class(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_load_and_chunk, file_path, file_ext, content_hash)
+            for _, file_path, file_ext, _, content_hash, *_ in pending
+        ]
+        
+        # Phase 3: prepare chunks of every file for a combined indexing pass
+        for future, job in zip(futures, pending):
+            i, file_path, file_ext, base_filename, content_hash, file_size, original_filename, old_hash = job
             try:
-                # Pass last_indexed timestamp to ensure consistency with chunk metadata
-                update_document(
+                chunks = future.result()
+                
+                # If update scenario, delete old chunks and old registry entry
+                if old_hash:
+                    _remove_previous_version(base_filename, old_hash)
+                
+                # Generate chunk IDs (include content_hash to prevent collisions)
+                chunk_ids = generate_chunk_ids(base_filename, len(chunks), content_hash=content_hash)
+                chunks = prepare_chunks_for_indexing(
+                    chunks,
+                    conversation_id=conversation_id,
+                    original_filename=original_filename,
+                    file_path=file_path,
                     content_hash=content_hash,
-                    chunk_count=len(chunks),
-                    last_indexed=now
+                    upload_timestamp=now_iso,
+                    last_indexed_timestamp=now_iso
                 )
-            except Exception as update_error:
-                logger.error(f"Failed to update document in registry: {str(update_error)}")
-                # Continue even if registry update fails (best effort)
-        
-        # Provide detailed status
-        if old_hash:
-            status = f"Successfully updated and re-indexed {len(chunks)} chunks from {base_filename}"
+                
+                start = len(all_chunks)
+                all_chunks.extend(chunks)
+                all_chunk_ids.extend(chunk_ids)
+                staged.append((job, start, len(all_chunks)))
+            except Exception as e:
+                logger.error(f"Error processing file {file_path}: {str(e)}", exc_info=True)
+                statuses[i] = f"Error processing file: {str(e)}"
+    
+    # Phase 4: index chunks of all files in fixed-size batches, amortizing the
+    # embedding and insert round-trips across files
+    failed_batches = []  # (start, end, error)
+    for start in range(0, len(all_chunks), INDEX_BATCH_SIZE):
+        end = start + INDEX_BATCH_SIZE
+        try:
+            index_documents(all_chunks[start:end], all_chunk_ids[start:end])
+        except Exception as e:
+            logger.error(f"Error indexing chunks {start}-{min(end, len(all_chunks))}: {str(e)}", exc_info=True)
+            failed_batches.append((start, end, e))
+    
+    indexed = []
+    for job, start, end in staged:
+        i = job[0]
+        error = next((e for b_start, b_end, e in failed_batches if start < b_end and b_start < end), None)
+        if error is not None:
+            # Some of this file's chunks may already be indexed; a retry overwrites them by ID
+            statuses[i] = f"Error processing file: {str(error)}"
         else:
-            status = f"Successfully uploaded and indexed {len(chunks)} chunks from {base_filename}"
-        
-        # All DoclingLoader files are processed and ready for chat
-        docling_supported = [".pdf", ".docx", ".doc", ".xlsx", ".xls"]
-        if file_ext in docling_supported:
-            status += "\n(Processed document ready for chat)"
-        
-        return status
-    except Exception as e:
-        logger.error(f"Error processing file {file_path}: {str(e)}", exc_info=True)
-        return f"Error processing file: {str(e)}"
-
+            indexed.append((job, end - start))
+    
+    if not indexed:
+        return statuses
+    
+    # Phase 5: register all indexed documents with a single registry insert,
+    # falling back to per-document register/update if the bulk insert fails
+    try:
+        register_documents([
+            {
+                "filename": base_filename,
+                "content_hash": content_hash,
+                "file_size": file_size,
+                "chunk_count": chunk_count,
+                "conversation_id": conversation_id,
+                "upload_timestamp": now_iso,
+                "last_indexed_timestamp": now_iso
+            }
+            for (_, _, _, base_filename, content_hash, file_size, _, _), chunk_count in indexed
+        ])
+    except Exception as reg_error:
+        logger.warning(f"Bulk registration failed, registering documents individually: {str(reg_error)}")
+        for (_, _, _, base_filename, content_hash, file_size, _, _), chunk_count in indexed:
+            _register_or_update(base_filename, content_hash, file_size, chunk_count, conversation_id, now_iso)
+    
+    for (i, _, file_ext, base_filename, _, _, _, old_hash), chunk_count in indexed:
+        statuses[i] = _build_status(base_filename, file_ext, chunk_count, bool(old_hash))
+    
+    return statuses
@@ -4,9 +4,15 @@ Coordinates retrieval, prompt formatting, and LLM generation.
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 from langchain_core.documents import Document
-from langsmith import traceable
+
+try:
+    from langsmith import traceable
+except ImportError:
+    # Tracing is optional; without langsmith the pipeline runs undecorated
+    def traceable(*args, **kwargs):
+        return lambda func: func
 
 from backend.core.retriever import retrieve_documents
 from backend.core.prompts import format_rag_prompt
@@ -15,6 +21,48 @@ from backend.core.llm import get_llm
 logger = logging.getLogger(__name__)
 
 
+def retrieve_context(question: str, conversation_id: Optional[str] = None) -> Tuple[List[Document], str]:
+    """Retrieve documents for a question and build the LLM context string.
+    
+    Args:
+        question: User question
+        conversation_id: Optional conversation ID to filter documents by chat session
+        
+    Returns:
+        Tuple of (documents with non-empty page_content, context string).
+        The context string is empty if no documents were found.
+    """
+    # Retrieve documents with optional conversation filtering
+    # retrieve_documents guarantees it returns a list (never None)
+    # %-style arguments with a %.50s precision truncate the question lazily,
+    # only when the record is actually emitted
+    logger.info("Retrieving documents for question: '%.50s...' with conversation_id: %s", question, conversation_id)
+    docs = retrieve_documents(question, conversation_id=conversation_id)
+    logger.info(f"Retrieved {len(docs)} documents")
+    
+    # Format context from retrieved documents
+    # Documents are already validated in retrieve_documents, but ensure page_content exists
+    # Collect valid documents and their texts in a single pass
+    valid_docs = []
+    texts = []
+    for doc in docs:
+        page_content = doc.page_content
+        if page_content:
+            valid_docs.append(doc)
+            texts.append(page_content)
+    logger.info(f"Valid documents with page_content: {len(valid_docs)}")
+    
+    # Build context string from valid documents
+    if texts:
+        context = "\n\n".join(texts)
+        logger.info(f"Built context string of length {len(context)} characters from {len(valid_docs)} documents")
+    else:
+        context = ""
+        logger.warning("No valid documents found - context will be empty. Question: '%.50s...'", question)
+    
+    return valid_docs, context
+
+
 @traceable(name="RAGApp_v2")
 def run_rag_pipeline(question: str, conversation_id: Optional[str] = None) -> Dict[str, Any]:
     """Run the RAG pipeline and return structured response with sources.
@@ -34,24 +82,8 @@ def run_rag_pipeline(question: str, conversation_id: Optional[str] = None) -> Di
         Dictionary with 'answer', 'context', and 'input' keys.
         'context' is always a list of Document objects (never None).
     """
-    # Step 1: Retrieve documents with optional conversation filtering
-    # retrieve_documents guarantees it returns a list (never None)
-    logger.info(f"Retrieving documents for question: '{question[:50]}...' with conversation_id: {conversation_id}")
-    docs = retrieve_documents(question, conversation_id=conversation_id)
-    logger.info(f"Retrieved {len(docs)} documents")
-    
-    # Step 2: Format context from retrieved documents
-    # Documents are already validated in retrieve_documents, but ensure page_content exists
-    valid_docs = [doc for doc in docs if doc.page_content]
-    logger.info(f"Valid documents with page_content: {len(valid_docs)}")
-    
-    # Build context string from valid documents
-    if valid_docs:
-        context = "\n\n".join(doc.page_content for doc in valid_docs)
-        logger.info(f"Built context string of length {len(context)} characters from {len(valid_docs)} documents")
-    else:
-        context = ""
-        logger.warning(f"No valid documents found - context will be empty. Question: '{question[:50]}...'")
+    # Steps 1-2: Retrieve documents and build the context string
+    valid_docs, context = retrieve_context(question, conversation_id)
     
     # Step 3: Generate answer using LLM
     answer = generate_answer(context, question, valid_docs)
@@ -94,3 +126,27 @@ def generate_answer(context: str, question: str, docs: list) -> str:
     
     return answer
 
+
+def stream_answer(context: str, question: str) -> Iterator[str]:
+    """Stream the LLM answer for a question token by token.
+    
+    Streaming variant of generate_answer: yields each piece of the answer as
+    Ollama generates it, so callers can show the first tokens without waiting
+    for the full response.
+    
+    Args:
+        context: Retrieved context documents formatted as string
+        question: User's question
+        
+    Yields:
+        Non-empty answer text deltas
+    """
+    if not context:
+        logger.warning("Context is empty - LLM will not have document context to answer from")
+    
+    formatted_prompt = format_rag_prompt(context, question)
+    
+    for chunk in get_llm().stream(formatted_prompt):
+        delta = chunk.content if hasattr(chunk, 'content') else str(chunk)
+        if delta:
+            yield delta
@@ -0,0 +1,31 @@
+"""
+Chunk ID construction utilities shared by the indexer and the document registry.
+"""
+
+import re
+from typing import Optional
+
+# Matches every character not allowed in chunk IDs (alphanumerics, '_', '-', '.')
+_UNSAFE_ID_CHARS = re.compile(r"[^\w.-]")
+
+
+def chunk_id_prefix(filename: str, content_hash: Optional[str] = None) -> str:
+    """Build the shared prefix of all chunk IDs for a document.
+    
+    The filename is sanitized once so callers can build each ID with a single
+    string concatenation (prefix + str(i)).
+    
+    Args:
+        filename: Base filename (without path)
+        content_hash: Optional content hash; its first 8 characters are included
+        
+    Returns:
+        Prefix in format: {filename}_{hash}_ or {filename}_ if no hash
+    """
+    # Sanitize filename to ensure valid ID format
+    safe_filename = _UNSAFE_ID_CHARS.sub("_", filename)
+    
+    # Use first 8 characters of hash for brevity while maintaining uniqueness
+    if content_hash:
+        return f"{safe_filename}_{content_hash[:8]}_"
+    return f"{safe_filename}_"
@@ -4,12 +4,19 @@ Chunking strategy detection utilities.
 
 from typing import List, Any
 
+# Strategy of TXT chunks indexed before chunks recorded their own strategy
+# (1000-character splitter with 100 characters of overlap)
+LEGACY_TXT_CHUNKING_STRATEGY = "fixed_1000_overlap_100"
+
 
 def get_chunking_strategy(context_docs: List[Any]) -> str:
     """Determine chunking strategy identifier based on retrieved documents.
     
     All files loaded with DoclingLoader (PDF, DOCX, XLSX, etc.) use unified
-    Docling chunking via HybridChunker. TXT files may use fixed-size chunking.
+    Docling chunking via HybridChunker. TXT files use fixed-size chunking; the
+    splitter parameters are read from each chunk's "chunking_strategy"
+    metadata, recorded at index time, so chunks indexed under an older
+    configuration keep their original label.
     
     Args:
         context_docs: List of retrieved document chunks
@@ -20,7 +27,7 @@ def get_chunking_strategy(context_docs: List[Any]) -> str:
     # Check if documents have metadata indicating chunking strategy
     # Files chunked with DoclingLoader typically have dl_meta in metadata
     has_docling_meta = False
-    has_fixed_chunking = False
+    fixed_strategies = set()
     
     # Docling-supported file extensions
     docling_extensions = ('.pdf', '.docx', '.doc', '.xlsx', '.xls')
@@ -35,15 +42,16 @@ def get_chunking_strategy(context_docs: List[Any]) -> str:
             if source.endswith(docling_extensions):
                 has_docling_meta = True
             elif source.endswith('.txt'):
-                has_fixed_chunking = True
+                fixed_strategies.add(doc.metadata.get('chunking_strategy', LEGACY_TXT_CHUNKING_STRATEGY))
     
     # Determine strategy identifier
-    if has_docling_meta and has_fixed_chunking:
+    if has_docling_meta and fixed_strategies:
         return "docling_hybrid_unified_with_txt_fallback"
     elif has_docling_meta:
         return "docling_hybrid_unified"
-    elif has_fixed_chunking:
-        return "fixed_1000_overlap_100"
+    elif fixed_strategies:
+        # Chunks split under different configurations are labeled with all of them
+        return "+".join(sorted(fixed_strategies))
     else:
         # Default fallback - assume unified docling chunking
         return "docling_hybrid_unified"
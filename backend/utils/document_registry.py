@@ -5,8 +5,9 @@ Provides CRUD operations for document metadata tracking.
 Row Level Security (RLS):
 This module uses the Supabase anon key for authentication. RLS policies must be
 configured on the 'documents' table to allow the anon role to perform:
-- SELECT: For reading documents (get_document_by_hash, get_document_by_filename)
-- INSERT: For registering new documents (register_document)
+- SELECT: For reading documents (get_document_by_hash, get_document_by_filename,
+  get_documents_by_hash_or_filename)
+- INSERT: For registering new documents (register_document, register_documents)
 - UPDATE: For updating document metadata (update_document)
 - DELETE: For deleting documents (delete_document)
 
@@ -14,21 +15,40 @@ See migration: add_rls_policies_for_documents
 """
 
 import logging
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
 from backend.core.config import SUPABASE_URL, SUPABASE_ANON_KEY
+from backend.utils.chunk_ids import chunk_id_prefix
+from backend.utils.timestamps import to_isoformat, utc_now_iso
 
 logger = logging.getLogger(__name__)
 
 # Global Supabase client instance
 _supabase_client: Optional[Client] = None
 
+# Cached request builder for the "documents" table (created with the client)
+_documents_table_builder = None
+
+# Guards client creation when several request threads initialize concurrently
+_client_lock = threading.Lock()
+
+# PostgreSQL error code raised when RLS policies block an operation
+# 42501: insufficient_privilege (includes "violates row-level security policy")
+RLS_ERROR_CODES = frozenset({"42501"})
+
+# PostgREST error codes raised when the API key itself is rejected
+# PGRST301: JWT could not be decoded or is invalid (e.g. wrong or expired key)
+AUTH_ERROR_CODES = frozenset({"PGRST301"})
+
 
 def get_supabase_client() -> Client:
     """Initialize and return Supabase client instance.
     
-    Uses singleton pattern to ensure only one instance is created.
+    Uses a thread-safe singleton (double-checked locking) to ensure only one
+    instance is created, even when concurrent requests initialize it.
     Validation of environment variables is deferred here (not at module import time)
     to allow graceful degradation if Supabase is unavailable.
     
@@ -38,9 +58,17 @@ def get_supabase_client() -> Client:
     Raises:
         RuntimeError: If Supabase URL or key is not configured
     """
-    global _supabase_client
+    global _supabase_client, _documents_table_builder
+    
+    # Fast path: no locking once the client exists
+    if _supabase_client is not None:
+        return _supabase_client
     
-    if _supabase_client is None:
+    with _client_lock:
+        # Re-check under the lock: another thread may have created the client
+        if _supabase_client is not None:
+            return _supabase_client
+        
         # Validate required environment variables (deferred from config.py)
         if not SUPABASE_URL:
             error_msg = (
@@ -60,7 +88,11 @@ def get_supabase_client() -> Client:
             raise RuntimeError(error_msg)
         
         try:
-            _supabase_client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+            client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+            # Request builders are stateless: each select/insert/update/delete
+            # call creates a fresh query, so one builder can be shared
+            _documents_table_builder = client.table("documents")
+            _supabase_client = client
             # Mask URL in logs to avoid exposing project identifier
             masked_url = f"{SUPABASE_URL[:20]}..." if SUPABASE_URL and len(SUPABASE_URL) > 20 else "***"
             logger.info(f"Supabase client initialized for project: {masked_url}")
@@ -72,6 +104,49 @@ def get_supabase_client() -> Client:
     return _supabase_client
 
 
+def _raise_if_rls_error(error: Exception, operation: str, context: str) -> None:
+    """Raise a descriptive RuntimeError if a Supabase error is an RLS violation.
+    
+    Matches on the PostgREST error code rather than on the error message text.
+    A rejected API key is reported as an authentication error instead, since
+    changing RLS policies would not fix it.
+    
+    Args:
+        error: Exception raised by the Supabase client
+        operation: SQL operation that was attempted (SELECT, INSERT, UPDATE, DELETE)
+        context: Description of the failed call for the log message
+        
+    Raises:
+        RuntimeError: If the error was caused by an RLS policy or a rejected API key
+    """
+    if isinstance(error, APIError) and error.code in AUTH_ERROR_CODES:
+        logger.error(f"Supabase authentication error {context}: {error.message}")
+        raise RuntimeError(
+            "Supabase rejected the API key. "
+            "Please check that SUPABASE_ANON_KEY is set to a valid, unexpired anon key."
+        ) from error
+    if isinstance(error, APIError) and error.code in RLS_ERROR_CODES:
+        logger.error(f"RLS policy error {context}: {error.message}")
+        raise RuntimeError(
+            "Access denied by Row Level Security policy. "
+            f"Please ensure RLS policies allow {operation} operations for the anon role."
+        ) from error
+
+
+def _documents_table():
+    """Return the cached request builder for the "documents" table.
+    
+    Returns:
+        Request builder for the "documents" table
+        
+    Raises:
+        RuntimeError: If Supabase client cannot be initialized
+    """
+    if _documents_table_builder is None:
+        get_supabase_client()
+    return _documents_table_builder
+
+
 def get_document_by_hash(content_hash: str) -> Optional[Dict]:
     """Get document by content hash.
     
@@ -85,21 +160,14 @@ def get_document_by_hash(content_hash: str) -> Optional[Dict]:
         RuntimeError: If Supabase client cannot be initialized or RLS policy blocks access
     """
     try:
-        client = get_supabase_client()
-        result = client.table("documents").select("*").eq("content_hash", content_hash).execute()
+        result = _documents_table().select("*").eq("content_hash", content_hash).execute()
         
         if result.data and len(result.data) > 0:
             return result.data[0]
         return None
     except Exception as e:
-        error_msg = str(e).lower()
-        # Check for RLS-related errors
-        if "row-level security" in error_msg or "policy" in error_msg or "permission denied" in error_msg:
-            logger.error(f"RLS policy error getting document by hash {content_hash[:16]}...: {str(e)}")
-            raise RuntimeError(
-                "Access denied by Row Level Security policy. "
-                "Please ensure RLS policies allow SELECT operations for the anon role."
-            ) from e
+        # Translate RLS violations into a descriptive RuntimeError
+        _raise_if_rls_error(e, "SELECT", f"getting document by hash {content_hash[:16]}...")
         logger.error(f"Error getting document by hash {content_hash[:16]}...: {str(e)}")
         raise
 
@@ -117,31 +185,71 @@ def get_document_by_filename(filename: str) -> List[Dict]:
         RuntimeError: If Supabase client cannot be initialized or RLS policy blocks access
     """
     try:
-        client = get_supabase_client()
-        result = client.table("documents").select("*").eq("filename", filename).execute()
+        result = _documents_table().select("*").eq("filename", filename).execute()
         
         return result.data if result.data else []
     except Exception as e:
-        error_msg = str(e).lower()
-        # Check for RLS-related errors
-        if "row-level security" in error_msg or "policy" in error_msg or "permission denied" in error_msg:
-            logger.error(f"RLS policy error getting documents by filename {filename}: {str(e)}")
-            raise RuntimeError(
-                "Access denied by Row Level Security policy. "
-                "Please ensure RLS policies allow SELECT operations for the anon role."
-            ) from e
+        # Translate RLS violations into a descriptive RuntimeError
+        _raise_if_rls_error(e, "SELECT", f"getting documents by filename {filename}")
         logger.error(f"Error getting documents by filename {filename}: {str(e)}")
         raise
 
 
+def _quote_filter_value(value: str) -> str:
+    """Quote a value for use inside a PostgREST logical (or/and) filter.
+    
+    Values containing reserved characters (",", ".", ":", "(", ")") must be
+    double-quoted; backslashes and double quotes inside are escaped.
+    
+    Args:
+        value: Raw filter value
+    
+    Returns:
+        Double-quoted, escaped filter value
+    """
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def get_documents_by_hash_or_filename(content_hash: str, filename: str) -> List[Dict]:
+    """Get all documents matching either a content hash or a filename in one query.
+    
+    Used for de-duplication: a row with the same hash is a duplicate, a row with
+    the same filename but a different hash is a previous version.
+    
+    Args:
+        content_hash: SHA256 hash of the file content
+        filename: Filename to search for
+    
+    Returns:
+        List of document records (may be empty)
+    
+    Raises:
+        RuntimeError: If Supabase client cannot be initialized or RLS policy blocks access
+    """
+    try:
+        filter_expr = (
+            f"content_hash.eq.{_quote_filter_value(content_hash)},"
+            f"filename.eq.{_quote_filter_value(filename)}"
+        )
+        result = _documents_table().select("*").or_(filter_expr).execute()
+        
+        return result.data if result.data else []
+    except Exception as e:
+        # Translate RLS violations into a descriptive RuntimeError
+        _raise_if_rls_error(e, "SELECT", f"getting documents by hash {content_hash[:16]}... or filename {filename}")
+        logger.error(f"Error getting documents by hash {content_hash[:16]}... or filename {filename}: {str(e)}")
+        raise
+
+
 def register_document(
     filename: str,
     content_hash: str,
     file_size: int,
     chunk_count: int,
     conversation_id: Optional[str] = None,
-    upload_timestamp: Optional[datetime] = None,
-    last_indexed_timestamp: Optional[datetime] = None
+    upload_timestamp: Optional[Union[datetime, str]] = None,
+    last_indexed_timestamp: Optional[Union[datetime, str]] = None
 ) -> Dict:
     """Register a new document in the registry.
     
@@ -151,8 +259,8 @@ def register_document(
         file_size: File size in bytes
         chunk_count: Number of chunks created from the document
         conversation_id: Optional conversation ID to associate with the document
-        upload_timestamp: Timestamp when file was uploaded (defaults to now)
-        last_indexed_timestamp: Timestamp when file was last indexed (defaults to now)
+        upload_timestamp: Timestamp (datetime or ISO string) when file was uploaded (defaults to now)
+        last_indexed_timestamp: Timestamp (datetime or ISO string) when file was last indexed (defaults to now)
         
     Returns:
         Created document record as dictionary
@@ -162,11 +270,10 @@ def register_document(
         Exception: If document with same hash already exists (should use update_document instead)
     """
     try:
-        client = get_supabase_client()
         # Use provided timestamps or default to now (ensures consistency with chunk metadata)
-        now = datetime.utcnow()
-        upload_ts = (upload_timestamp or now).isoformat()
-        indexed_ts = (last_indexed_timestamp or now).isoformat()
+        now_iso = utc_now_iso()
+        upload_ts = to_isoformat(upload_timestamp or now_iso)
+        indexed_ts = to_isoformat(last_indexed_timestamp or now_iso)
         
         data = {
             "filename": filename,
@@ -178,7 +285,7 @@ def register_document(
             "conversation_id": conversation_id
         }
         
-        result = client.table("documents").insert(data).execute()
+        result = _documents_table().insert(data).execute()
         
         if result.data and len(result.data) > 0:
             logger.info(f"Registered document: {filename} (hash: {content_hash[:16]}...)")
@@ -186,29 +293,71 @@ def register_document(
         else:
             raise RuntimeError("Failed to register document: no data returned")
     except Exception as e:
-        error_msg = str(e).lower()
-        # Check for RLS-related errors
-        if "row-level security" in error_msg or "policy" in error_msg or "permission denied" in error_msg:
-            logger.error(f"RLS policy error registering document {filename}: {str(e)}")
-            raise RuntimeError(
-                "Access denied by Row Level Security policy. "
-                "Please ensure RLS policies allow INSERT operations for the anon role."
-            ) from e
+        # Translate RLS violations into a descriptive RuntimeError
+        _raise_if_rls_error(e, "INSERT", f"registering document {filename}")
         logger.error(f"Error registering document {filename}: {str(e)}")
         raise
 
 
+def register_documents(documents: List[Dict]) -> List[Dict]:
+    """Register several new documents in the registry with a single insert.
+    
+    Args:
+        documents: List of dictionaries with the same fields as register_document's
+                  arguments (filename, content_hash, file_size, chunk_count, and
+                  optional conversation_id, upload_timestamp, last_indexed_timestamp)
+    
+    Returns:
+        List of created document records
+    
+    Raises:
+        RuntimeError: If Supabase client cannot be initialized
+        Exception: If any document with the same hash already exists (the whole insert fails)
+    """
+    if not documents:
+        return []
+    
+    try:
+        now_iso = utc_now_iso()
+        
+        data = [
+            {
+                "filename": doc["filename"],
+                "content_hash": doc["content_hash"],
+                "file_size": doc["file_size"],
+                "upload_timestamp": to_isoformat(doc.get("upload_timestamp") or now_iso),
+                "last_indexed_timestamp": to_isoformat(doc.get("last_indexed_timestamp") or now_iso),
+                "chunk_count": doc["chunk_count"],
+                "conversation_id": doc.get("conversation_id")
+            }
+            for doc in documents
+        ]
+        
+        result = _documents_table().insert(data).execute()
+        
+        if result.data and len(result.data) > 0:
+            logger.info(f"Registered {len(result.data)} documents")
+            return result.data
+        else:
+            raise RuntimeError("Failed to register documents: no data returned")
+    except Exception as e:
+        # Translate RLS violations into a descriptive RuntimeError
+        _raise_if_rls_error(e, "INSERT", f"registering {len(documents)} documents")
+        logger.error(f"Error registering {len(documents)} documents: {str(e)}")
+        raise
+
+
 def update_document(
     content_hash: str,
     chunk_count: int,
-    last_indexed: Optional[datetime] = None
+    last_indexed: Optional[Union[datetime, str]] = None
 ) -> Dict:
     """Update an existing document's indexing information.
     
     Args:
         content_hash: SHA256 hash of file content (identifies the document)
         chunk_count: Updated number of chunks
-        last_indexed: Optional timestamp for last indexing (defaults to now)
+        last_indexed: Optional timestamp (datetime or ISO string) for last indexing (defaults to now)
         
     Returns:
         Updated document record as dictionary
@@ -217,14 +366,12 @@ def update_document(
         RuntimeError: If Supabase client cannot be initialized or document not found
     """
     try:
-        client = get_supabase_client()
-        
         update_data = {
             "chunk_count": chunk_count,
-            "last_indexed_timestamp": (last_indexed or datetime.utcnow()).isoformat()
+            "last_indexed_timestamp": to_isoformat(last_indexed or utc_now_iso())
         }
         
-        result = client.table("documents").update(update_data).eq("content_hash", content_hash).execute()
+        result = _documents_table().update(update_data).eq("content_hash", content_hash).execute()
         
         if result.data and len(result.data) > 0:
             logger.info(f"Updated document with hash: {content_hash[:16]}...")
@@ -232,14 +379,8 @@ def update_document(
         else:
             raise RuntimeError(f"Document with hash {content_hash[:16]}... not found for update")
     except Exception as e:
-        error_msg = str(e).lower()
-        # Check for RLS-related errors
-        if "row-level security" in error_msg or "policy" in error_msg or "permission denied" in error_msg:
-            logger.error(f"RLS policy error updating document with hash {content_hash[:16]}...: {str(e)}")
-            raise RuntimeError(
-                "Access denied by Row Level Security policy. "
-                "Please ensure RLS policies allow UPDATE operations for the anon role."
-            ) from e
+        # Translate RLS violations into a descriptive RuntimeError
+        _raise_if_rls_error(e, "UPDATE", f"updating document with hash {content_hash[:16]}...")
         logger.error(f"Error updating document with hash {content_hash[:16]}...: {str(e)}")
         raise
 
@@ -254,19 +395,12 @@ def delete_document(content_hash: str) -> None:
         RuntimeError: If Supabase client cannot be initialized
     """
     try:
-        client = get_supabase_client()
-        result = client.table("documents").delete().eq("content_hash", content_hash).execute()
+        result = _documents_table().delete().eq("content_hash", content_hash).execute()
         
         logger.info(f"Deleted document from registry: {content_hash[:16]}...")
     except Exception as e:
-        error_msg = str(e).lower()
-        # Check for RLS-related errors
-        if "row-level security" in error_msg or "policy" in error_msg or "permission denied" in error_msg:
-            logger.error(f"RLS policy error deleting document with hash {content_hash[:16]}...: {str(e)}")
-            raise RuntimeError(
-                "Access denied by Row Level Security policy. "
-                "Please ensure RLS policies allow DELETE operations for the anon role."
-            ) from e
+        # Translate RLS violations into a descriptive RuntimeError
+        _raise_if_rls_error(e, "DELETE", f"deleting document with hash {content_hash[:16]}...")
         logger.error(f"Error deleting document with hash {content_hash[:16]}...: {str(e)}")
         raise
 
@@ -294,11 +428,7 @@ def get_all_chunk_ids_for_document(content_hash: str) -> List[str]:
     filename = doc["filename"]
     chunk_count = doc["chunk_count"]
     
-    # Sanitize filename to match the pattern used in generate_chunk_ids
-    safe_filename = "".join(c if c.isalnum() or c in ('_', '-', '.') else '_' for c in filename)
+    # Use the same prefix as generate_chunk_ids
+    prefix = chunk_id_prefix(filename, content_hash)
     
-    # Include hash prefix to match the updated generate_chunk_ids format
-    hash_prefix = content_hash[:8]
-    
-    return [f"{safe_filename}_{hash_prefix}_{i}" for i in range(chunk_count)]
-
+    return [prefix + str(i) for i in range(chunk_count)]
@@ -2,8 +2,14 @@
 Metadata cleaning and serialization utilities for ChromaDB compatibility.
 """
 
-import json
-from typing import Dict, Any
+from typing import Dict, Any, NamedTuple, Optional
+
+import orjson
+
+
+def _dumps(value: Any) -> str:
+    """Serialize a value to a JSON string with orjson."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
 
 
 def clean_metadata_for_chromadb(metadata: Dict[str, Any]) -> Dict[str, Any]:
@@ -26,10 +32,37 @@ def clean_metadata_for_chromadb(metadata: Dict[str, Any]) -> Dict[str, Any]:
             cleaned_metadata[key] = value
         elif isinstance(value, (dict, list)):
             # Complex types (like dl_meta) need to be serialized to JSON string
-            cleaned_metadata[key] = json.dumps(value) if value else None
+            cleaned_metadata[key] = _dumps(value) if value else None
         else:
             # Convert other types to string
             cleaned_metadata[key] = str(value) if value else None
     
     return cleaned_metadata
 
+
+class DoclingLocation(NamedTuple):
+    """Location of a Docling chunk within its source document."""
+    section: str
+    page_no: Optional[int]
+
+
+def extract_docling_location(dl_meta: Dict[str, Any]) -> DoclingLocation:
+    """Extract the section headings and first page number from Docling chunk metadata.
+    
+    Args:
+        dl_meta: Docling chunk metadata (the 'dl_meta' dict set by DoclingLoader)
+        
+    Returns:
+        DoclingLocation with comma-joined headings and the first provenance page number
+    """
+    section = ", ".join(dl_meta.get("headings") or [])
+    page_no = next(
+        (
+            prov["page_no"]
+            for item in dl_meta.get("doc_items") or []
+            for prov in item.get("prov") or []
+            if "page_no" in prov
+        ),
+        None
+    )
+    return DoclingLocation(section=section, page_no=page_no)
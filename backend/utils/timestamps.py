@@ -0,0 +1,34 @@
+"""
+Timestamp formatting utilities.
+"""
+
+from datetime import datetime, timezone
+from typing import Union
+
+
+def utc_now_iso() -> str:
+    """Return the current UTC time as a naive ISO 8601 string.
+    
+    Produces exactly what the deprecated datetime.utcnow().isoformat() did (no
+    offset suffix), so new registry rows and chunk metadata keep the format of
+    existing ones and string comparison/sorting on the timestamps still works.
+    
+    Returns:
+        ISO 8601 timestamp string such as "2024-01-01T12:00:00.123456"
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def to_isoformat(timestamp: Union[datetime, str]) -> str:
+    """Return the ISO 8601 representation of a timestamp.
+    
+    Pre-formatted ISO strings are returned unchanged, so callers can format a
+    timestamp once and pass the same string to every consumer.
+    
+    Args:
+        timestamp: datetime instance or ISO 8601 string
+        
+    Returns:
+        ISO 8601 timestamp string
+    """
+    return timestamp if isinstance(timestamp, str) else timestamp.isoformat()
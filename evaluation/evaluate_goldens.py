@@ -13,28 +13,52 @@ Requires:
 - Golden dataset JSON file with expected_output and context fields
 """
 
+import asyncio
 import json
-import requests
+import os
+import sys
 import argparse
-from collections import defaultdict
-from statistics import mean, stdev
+import aiohttp
+from pathlib import Path
 from typing import List, Dict, Any
 
+# Ensure project root is in Python path before importing evaluation modules
+# Script is in evaluation/ directory, so project root is parent.parent
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
 from deepeval.test_case import LLMTestCase
-from deepeval.models import OllamaModel
 from deepeval.metrics import (
     ContextualPrecisionMetric,
     ContextualRecallMetric,
 )
 
+from evaluation.metrics import evaluate_test_cases, get_judge_model
+from evaluation.score_stats import RunningStats
+
 # Configuration constants
 DEFAULT_GOLDENS_PATH = "TestNotebooks/synthetic_data/my_dataset.json"
 API_URL = "http://localhost:8000/api/chat"  # RAG API endpoint
+# Maximum number of concurrent requests to the RAG API. Each request holds an
+# LLM generation on the server, so there is no point exceeding Ollama's
+# parallel slots (OLLAMA_NUM_PARALLEL); extra requests just queue server-side.
+API_CONCURRENCY = int(os.getenv("RAG_API_CONCURRENCY", "4"))
+API_REQUEST_TIMEOUT = 30  # Seconds one request may take once the server starts on it
+# Requests in flight can still queue behind each other on the server, so the
+# timeout covers a full round of the other in-flight requests as well
+API_TIMEOUT = aiohttp.ClientTimeout(total=API_REQUEST_TIMEOUT * API_CONCURRENCY)
 
 # Ollama configuration for evaluation
 OLLAMA_MODEL = "deepseek-r1:1.5b"
 OLLAMA_BASE_URL = "http://localhost:11434"
 
+# Metric classes to use for evaluation (Reference-Based)
+METRIC_CLASSES = [
+    ContextualPrecisionMetric,
+    ContextualRecallMetric,
+]
+
 
 def load_goldens(goldens_path: str) -> List[Dict[str, Any]]:
     """Load golden dataset from JSON file.
@@ -57,10 +81,11 @@ def load_goldens(goldens_path: str) -> List[Dict[str, Any]]:
         return []
 
 
-def query_rag_api(question: str) -> tuple[str, List[str]]:
+async def query_rag_api(session: aiohttp.ClientSession, question: str) -> tuple[str, List[str]]:
     """Query the RAG API and extract answer and retrieved context.
     
     Args:
+        session: Shared aiohttp client session
         question: User question to send to the API
         
     Returns:
@@ -70,13 +95,13 @@ def query_rag_api(question: str) -> tuple[str, List[str]]:
         Exception: If API call fails
     """
     try:
-        response = requests.post(
+        async with session.post(
             API_URL,
             json={"question": question},
-            timeout=30
-        )
-        response.raise_for_status()
-        data = response.json()
+            timeout=API_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
         
         # Extract answer
         answer = data.get("answer", "")
@@ -87,103 +112,76 @@ def query_rag_api(question: str) -> tuple[str, List[str]]:
         retrieved_context = [s.get("content", "") for s in sources if s and s.get("content")]
         
         return answer, retrieved_context
-    except requests.exceptions.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         raise Exception(f"API request failed: {e}")
 
 
-def create_test_case(golden: Dict[str, Any], actual_answer: str, retrieved_context: List[str]) -> LLMTestCase:
-    """Create a DeepEval test case from golden data and API response.
+async def query_goldens(goldens: List[Dict[str, Any]]) -> tuple[List[LLMTestCase], int]:
+    """Query the RAG API for all goldens concurrently and create test cases.
     
-    Args:
-        golden: Golden dataset entry with input, expected_output, and context
-        actual_answer: Answer from RAG API
-        retrieved_context: Context retrieved by RAG API
-        
-    Returns:
-        LLMTestCase object
-    """
-    return LLMTestCase(
-        input=golden.get("input", ""),
-        actual_output=actual_answer,
-        expected_output=golden.get("expected_output", ""),
-        retrieval_context=retrieved_context,
-        context=golden.get("context", [])  # Expected context from golden
-    )
-
-
-def evaluate_test_cases(test_cases: List[LLMTestCase]) -> Dict[str, List[float]]:
-    """Evaluate test cases using DeepEval metrics with Ollama.
+    At most API_CONCURRENCY requests are in flight at a time.
     
     Args:
-        test_cases: List of LLMTestCase objects
+        goldens: List of golden test cases
         
     Returns:
-        Dictionary mapping metric names to lists of scores
+        Tuple of (test_cases, failed_query_count). Test cases keep golden order.
     """
-    # Initialize Ollama model once for reuse (model can be reused)
-    ollama_model = OllamaModel(
-        model=OLLAMA_MODEL,
-        base_url=OLLAMA_BASE_URL,
-        temperature=0
-    )
-    
-    # Store scores for each metric
-    metric_scores = defaultdict(list)
-    
-    # Metric classes to evaluate
-    metric_classes = [
-        ("ContextualPrecisionMetric", ContextualPrecisionMetric),
-        ("ContextualRecallMetric", ContextualRecallMetric),
-    ]
+    semaphore = asyncio.Semaphore(API_CONCURRENCY)
     
-    # Evaluate each test case with each metric
-    print(f"Evaluating test cases using Ollama model: {OLLAMA_MODEL}...")
-    for i, test_case in enumerate(test_cases):
-        if (i + 1) % 5 == 0:
-            print(f"  Processed {i + 1}/{len(test_cases)} test cases...")
+    async def query(i: int, golden: Dict[str, Any], session: aiohttp.ClientSession):
+        question = golden.get("input", "")
+        if not question:
+            print(f"  Warning: Skipping golden {i+1} - missing 'input' field")
+            return None, False
         
-        # Create fresh metric instances for each test case to avoid state persistence
-        for metric_name, metric_class in metric_classes:
+        async with semaphore:
             try:
-                # Create a new metric instance for this test case
-                metric = metric_class(model=ollama_model)
-                metric.measure(test_case)
-                score = metric.score
-                if score is not None:
-                    metric_scores[metric_name].append(score)
+                print(f"  [{i+1}/{len(goldens)}] Querying: {question[:60]}...")
+                actual_answer, retrieved_context = await query_rag_api(session, question)
             except Exception as e:
-                print(f"  Warning: Failed to evaluate {metric_name} for test case {i+1}: {e}")
-                continue
+                print(f"  ✗ Failed to query API for golden {i+1}: {e}")
+                return None, True
+        
+        # Create test case
+        return create_test_case(golden, actual_answer, retrieved_context), False
     
-    print(f"Completed evaluation of {len(test_cases)} test cases\n")
-    return dict(metric_scores)
+    # Keep-alive connection pool sized to the request concurrency, so every
+    # in-flight request reuses an already-open connection to the API
+    connector = aiohttp.TCPConnector(limit=API_CONCURRENCY, keepalive_timeout=60)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        results = await asyncio.gather(*[query(i, golden, session) for i, golden in enumerate(goldens)])
+    
+    test_cases = [test_case for test_case, _ in results if test_case is not None]
+    failed_queries = sum(1 for _, failed in results if failed)
+    return test_cases, failed_queries
 
 
-def calculate_statistics(scores: List[float]) -> Dict[str, float]:
-    """Calculate statistics for a list of scores.
+def create_test_case(golden: Dict[str, Any], actual_answer: str, retrieved_context: List[str]) -> LLMTestCase:
+    """Create a DeepEval test case from golden data and API response.
     
     Args:
-        scores: List of score values
+        golden: Golden dataset entry with input, expected_output, and context
+        actual_answer: Answer from RAG API
+        retrieved_context: Context retrieved by RAG API
         
     Returns:
-        Dictionary with mean, std, min, max statistics
+        LLMTestCase object
     """
-    if not scores:
-        return {}
-    
-    return {
-        'mean': mean(scores),
-        'std': stdev(scores) if len(scores) > 1 else 0.0,
-        'min': min(scores),
-        'max': max(scores),
-    }
+    return LLMTestCase(
+        input=golden.get("input", ""),
+        actual_output=actual_answer,
+        expected_output=golden.get("expected_output", ""),
+        retrieval_context=retrieved_context,
+        context=golden.get("context", [])  # Expected context from golden
+    )
 
 
-def print_summary(metric_scores: Dict[str, List[float]], num_records: int):
+def print_summary(metric_scores: Dict[str, RunningStats], num_records: int):
     """Print evaluation summary statistics.
     
     Args:
-        metric_scores: Dictionary mapping metric names to lists of scores
+        metric_scores: Dictionary mapping metric names to running score statistics
         num_records: Number of records evaluated
     """
     print(f"\n{'='*60}")
@@ -196,11 +194,11 @@ def print_summary(metric_scores: Dict[str, List[float]], num_records: int):
         return
     
     for metric_name, scores in metric_scores.items():
-        if not scores:
+        stats = scores.summary()
+        if not stats:
             print(f"{metric_name}: No scores available")
             continue
         
-        stats = calculate_statistics(scores)
         print(f"{metric_name}:")
         print(f"  Mean:   {stats['mean']:.4f}")
         print(f"  StdDev: {stats['std']:.4f}")
@@ -245,28 +243,8 @@ Examples:
     print(f"Loaded {len(goldens)} golden test cases")
     print("Querying RAG API for each test case...\n")
     
-    # Query API and create test cases
-    test_cases = []
-    failed_queries = 0
-    
-    for i, golden in enumerate(goldens):
-        question = golden.get("input", "")
-        if not question:
-            print(f"  Warning: Skipping golden {i+1} - missing 'input' field")
-            continue
-        
-        try:
-            print(f"  [{i+1}/{len(goldens)}] Querying: {question[:60]}...")
-            actual_answer, retrieved_context = query_rag_api(question)
-            
-            # Create test case
-            test_case = create_test_case(golden, actual_answer, retrieved_context)
-            test_cases.append(test_case)
-            
-        except Exception as e:
-            print(f"  ✗ Failed to query API for golden {i+1}: {e}")
-            failed_queries += 1
-            continue
+    # Query API concurrently and create test cases
+    test_cases, failed_queries = asyncio.run(query_goldens(goldens))
     
     if not test_cases:
         print("\nNo test cases created. Cannot proceed with evaluation.")
@@ -281,7 +259,8 @@ Examples:
     print()
     
     # Evaluate test cases
-    metric_scores = evaluate_test_cases(test_cases)
+    judge = get_judge_model(OLLAMA_MODEL, OLLAMA_BASE_URL)
+    metric_scores = asyncio.run(evaluate_test_cases(test_cases, METRIC_CLASSES, judge, OLLAMA_MODEL))
     
     # Print summary
     print_summary(metric_scores, len(test_cases))
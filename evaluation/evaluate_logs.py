@@ -10,24 +10,40 @@ Note: This script does NOT require expected_output (ground truth), making it sui
 for continuous monitoring of live usage logs.
 """
 
-import json
+import asyncio
+import mmap
+import sys
 import os
 from collections import defaultdict
-from statistics import mean, stdev
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 
+import orjson
+
+# Ensure project root is in Python path before importing evaluation modules
+# Script is in evaluation/ directory, so project root is parent.parent
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from deepeval.models import DeepEvalBaseLLM
 from deepeval.test_case import LLMTestCase
-from deepeval.models import OllamaModel
 from deepeval.metrics import (
     AnswerRelevancyMetric,
     FaithfulnessMetric,
     ContextualRelevancyMetric,
 )
 
+from evaluation.metrics import evaluate_test_cases, get_judge_model
+from evaluation.score_stats import RunningStats
+
 # Configuration constants
 LOG_PATH = "logs/rag_turns.jsonl"
 MAX_RECORDS = None  # Set to an integer to limit records, or None for no limit
 FILTER_STRATEGY = None  # Set to a specific chunking_strategy string to filter, or None to include all
+PARALLEL_PARSE_THRESHOLD = 64 * 1024 * 1024  # Log files at least this large (bytes) are parsed in parallel
 
 # Ollama configuration
 OLLAMA_MODEL = "qwen3:0.6b"
@@ -41,144 +57,197 @@ METRIC_CLASSES = [
 ]
 
 
-def read_log_file(log_path: str) -> List[Dict[str, Any]]:
-    """Read and parse JSONL log file.
+def iter_log_records(log_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream and parse records from a JSONL log file.
     
     Args:
         log_path: Path to the JSONL log file
         
-    Returns:
-        List of parsed log records
+    Yields:
+        Parsed log records, skipping blank and malformed lines. Lines are
+        handed to orjson as raw bytes without an intermediate stripped copy.
     """
     if not os.path.exists(log_path):
         print(f"Error: Log file not found at {log_path}")
-        return []
+        return
     
-    records = []
-    with open(log_path, 'r', encoding='utf-8') as f:
+    with open(log_path, 'rb') as f:
         for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
+            if line.isspace():
                 continue
             try:
-                record = json.loads(line)
-                records.append(record)
-            except json.JSONDecodeError as e:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError as e:
                 print(f"Warning: Skipping malformed line {line_num}: {e}")
                 continue
+
+
+def _line_aligned_ranges(mm: mmap.mmap, num_ranges: int) -> List[Tuple[int, int]]:
+    """Split a memory-mapped file into byte ranges that end on line boundaries.
     
-    return records
+    Args:
+        mm: Memory-mapped file
+        num_ranges: Desired number of ranges
+        
+    Returns:
+        List of (start, end) byte offsets covering the whole file
+    """
+    size = len(mm)
+    step = max(size // num_ranges, 1)
+    ranges = []
+    start = 0
+    while start < size:
+        newline = mm.find(b'\n', min(start + step, size) - 1)
+        end = size if newline == -1 else newline + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
 
 
-def filter_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Filter records based on configuration.
+def _parse_range(log_path: str, start: int, end: int, strategy: Optional[str]) -> Tuple[int, List[Dict[str, Any]]]:
+    """Parse the JSONL records in one byte range of a log file (process pool worker).
     
     Args:
-        records: List of log records
+        log_path: Path to the JSONL log file
+        start: Start byte offset (beginning of a line)
+        end: End byte offset (just past a newline, or end of file)
+        strategy: Optional chunking_strategy to filter on
         
     Returns:
-        Filtered list of records
+        Tuple of (number of records parsed before filtering, filtered records in file order)
     """
-    # Filter by chunking strategy if specified
-    if FILTER_STRATEGY is not None:
-        records = [r for r in records if r.get('chunking_strategy') == FILTER_STRATEGY]
-        print(f"Filtered to {len(records)} records with strategy '{FILTER_STRATEGY}'")
+    loaded = 0
+    records = []
+    with open(log_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in mm[start:end].split(b'\n'):
+            if not line or line.isspace():
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                print(f"Warning: Skipping malformed line in bytes {start}-{end}: {e}")
+                continue
+            loaded += 1
+            if strategy is None or record.get('chunking_strategy') == strategy:
+                records.append(record)
+    return loaded, records
+
+
+def _print_read_summary(loaded: int, filtered: int) -> None:
+    """Print how many records were loaded and how many passed the filters.
     
-    # Limit to MAX_RECORDS if specified
+    Args:
+        loaded: Number of records parsed from the log file
+        filtered: Number of records matching FILTER_STRATEGY
+    """
+    if not loaded:
+        return
+    print(f"Loaded {loaded} records from log file")
+    if FILTER_STRATEGY is not None:
+        print(f"Filtered to {filtered} records with strategy '{FILTER_STRATEGY}'")
     if MAX_RECORDS is not None and MAX_RECORDS > 0:
-        records = records[:MAX_RECORDS]
         print(f"Limited to first {MAX_RECORDS} records")
-    
-    return records
 
 
-def create_test_cases(records: List[Dict[str, Any]]) -> List[LLMTestCase]:
-    """Create DeepEval test cases from log records.
+def read_log_file_parallel(log_path: str) -> List[Dict[str, Any]]:
+    """Parse a large JSONL log file across processes, applying FILTER_STRATEGY.
+    
+    The file is memory-mapped and split into line-aligned byte ranges, which
+    are parsed by a process pool and concatenated in file order.
     
     Args:
-        records: List of log records
+        log_path: Path to the JSONL log file
         
     Returns:
-        List of LLMTestCase objects
+        List of filtered log records
     """
-    return [
-        LLMTestCase(
-            input=record.get('user_query', ''),
-            actual_output=record.get('answer', ''),
-            retrieval_context=record.get('contexts', [])
+    num_workers = os.cpu_count() or 1
+    with open(log_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        ranges = _line_aligned_ranges(mm, num_workers)
+    
+    with ProcessPoolExecutor(max_workers=min(num_workers, len(ranges))) as executor:
+        parsed = executor.map(
+            _parse_range,
+            [log_path] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+            [FILTER_STRATEGY] * len(ranges),
         )
-        for record in records
-    ]
+        loaded = 0
+        filtered_records = []
+        for range_loaded, records in parsed:
+            loaded += range_loaded
+            filtered_records.extend(records)
+    
+    _print_read_summary(loaded, len(filtered_records))
+    return filtered_records
 
 
-def evaluate_test_cases(test_cases: List[LLMTestCase]) -> Dict[str, List[float]]:
-    """Evaluate test cases using DeepEval metrics with Ollama.
+def read_log_file(log_path: str) -> List[Dict[str, Any]]:
+    """Read JSONL log file, applying FILTER_STRATEGY and MAX_RECORDS while streaming.
+    
+    Only the records that pass the filters are kept in memory, and reading
+    stops as soon as MAX_RECORDS matching records have been collected (so the
+    loaded count only covers the records read up to that point). Large files
+    read without a record limit are parsed in parallel instead.
     
     Args:
-        test_cases: List of LLMTestCase objects
+        log_path: Path to the JSONL log file
         
     Returns:
-        Dictionary mapping metric names to lists of scores
+        List of filtered log records
     """
-    # Initialize Ollama model once for reuse (model can be reused)
-    ollama_model = OllamaModel(
-        model=OLLAMA_MODEL,
-        base_url=OLLAMA_BASE_URL,
-        temperature=0
-    )
-    
-    # Store scores for each metric
-    metric_scores = defaultdict(list)
-    
-    # Evaluate each test case with each metric
-    print(f"Evaluating test cases using Ollama model: {OLLAMA_MODEL}...")
-    for i, test_case in enumerate(test_cases):
-        if (i + 1) % 10 == 0:
-            print(f"  Processed {i + 1}/{len(test_cases)} test cases...")
-        
-        # Create fresh metric instances for each test case to avoid state persistence
-        for metric_class in METRIC_CLASSES:
-            metric_name = metric_class.__name__
-            try:
-                # Create a new metric instance for this test case
-                metric = metric_class(model=ollama_model)
-                metric.measure(test_case)
-                score = metric.score
-                if score is not None:
-                    metric_scores[metric_name].append(score)
-            except Exception as e:
-                print(f"  Warning: Failed to evaluate {metric_name} for test case {i+1}: {e}")
-                continue
+    unlimited = MAX_RECORDS is None or MAX_RECORDS <= 0
+    if unlimited and os.path.exists(log_path) and os.path.getsize(log_path) >= PARALLEL_PARSE_THRESHOLD:
+        return read_log_file_parallel(log_path)
+    
+    # Count records as they stream past each stage for the progress summary
+    counts = {'loaded': 0, 'filtered': 0}
     
-    print(f"Completed evaluation of {len(test_cases)} test cases\n")
-    return dict(metric_scores)
+    def counted(records: Iterator[Dict[str, Any]], stage: str) -> Iterator[Dict[str, Any]]:
+        for record in records:
+            counts[stage] += 1
+            yield record
+    
+    records = counted(iter_log_records(log_path), 'loaded')
+    
+    # Filter by chunking strategy if specified
+    if FILTER_STRATEGY is not None:
+        records = counted((r for r in records if r.get('chunking_strategy') == FILTER_STRATEGY), 'filtered')
+    
+    # Limit to MAX_RECORDS if specified
+    if MAX_RECORDS is not None and MAX_RECORDS > 0:
+        records = islice(records, MAX_RECORDS)
+    
+    records = list(records)
+    _print_read_summary(counts['loaded'], counts['filtered'])
+    return records
 
 
-def calculate_statistics(scores: List[float]) -> Dict[str, float]:
-    """Calculate statistics for a list of scores.
+def create_test_cases(records: List[Dict[str, Any]]) -> List[LLMTestCase]:
+    """Create DeepEval test cases from log records.
     
     Args:
-        scores: List of score values
+        records: List of log records
         
     Returns:
-        Dictionary with mean, std, min, max statistics
+        List of LLMTestCase objects
     """
-    if not scores:
-        return {}
-    
-    return {
-        'mean': mean(scores),
-        'std': stdev(scores) if len(scores) > 1 else 0.0,
-        'min': min(scores),
-        'max': max(scores),
-    }
+    return [
+        LLMTestCase(
+            input=record.get('user_query', ''),
+            actual_output=record.get('answer', ''),
+            retrieval_context=record.get('contexts', [])
+        )
+        for record in records
+    ]
 
 
-def print_summary(metric_scores: Dict[str, List[float]], num_records: int, strategy_name: str = None):
+def print_summary(metric_scores: Dict[str, RunningStats], num_records: int, strategy_name: str = None):
     """Print evaluation summary statistics.
     
     Args:
-        metric_scores: Dictionary mapping metric names to lists of scores
+        metric_scores: Dictionary mapping metric names to running score statistics
         num_records: Number of records evaluated
         strategy_name: Optional strategy name to include in header
     """
@@ -192,11 +261,11 @@ def print_summary(metric_scores: Dict[str, List[float]], num_records: int, strat
         return
     
     for metric_name, scores in metric_scores.items():
-        if not scores:
+        stats = scores.summary()
+        if not stats:
             print(f"{metric_name}: No scores available")
             continue
         
-        stats = calculate_statistics(scores)
         print(f"{metric_name}:")
         print(f"  Mean:   {stats['mean']:.4f}")
         print(f"  StdDev: {stats['std']:.4f}")
@@ -205,35 +274,74 @@ def print_summary(metric_scores: Dict[str, List[float]], num_records: int, strat
         print()
 
 
-def evaluate_records(records: List[Dict[str, Any]], strategy_name: str = None):
+def evaluate_records(
+    records: List[Dict[str, Any]],
+    strategy_name: str = None,
+    judge: Optional[DeepEvalBaseLLM] = None
+):
     """Evaluate records and print summary.
     
     Args:
         records: List of log records
         strategy_name: Optional strategy name for summary header
+        judge: Optional judge model shared across evaluation passes
     """
     test_cases = create_test_cases(records)
-    metric_scores = evaluate_test_cases(test_cases)
+    # Ollama judge is built once per process and shared by every evaluation pass;
+    # its responses are cached on disk so reruns skip already-answered prompts
+    judge = judge or get_judge_model(OLLAMA_MODEL, OLLAMA_BASE_URL)
+    metric_scores = asyncio.run(evaluate_test_cases(test_cases, METRIC_CLASSES, judge, OLLAMA_MODEL))
     print_summary(metric_scores, len(records), strategy_name=strategy_name)
 
 
-def evaluate_by_strategy(records: List[Dict[str, Any]]):
-    """Evaluate records grouped by chunking strategy.
+def has_multiple_strategies(records: List[Dict[str, Any]]) -> bool:
+    """Check whether records span more than one chunking strategy.
+    
+    Stops at the first record whose strategy differs from the first one.
     
     Args:
         records: List of log records
+        
+    Returns:
+        True if at least two distinct strategies are present
+    """
+    if not records:
+        return False
+    first = records[0].get('chunking_strategy', 'unknown')
+    return any(record.get('chunking_strategy', 'unknown') != first for record in records)
+
+
+def group_by_strategy(records: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group records by chunking strategy in a single pass.
+    
+    Args:
+        records: List of log records
+        
+    Returns:
+        Dictionary mapping strategy names to their records
     """
-    # Group records by chunking strategy
     strategy_groups = defaultdict(list)
     for record in records:
         strategy_groups[record.get('chunking_strategy', 'unknown')].append(record)
+    return dict(strategy_groups)
+
+
+def evaluate_by_strategy(
+    strategy_groups: Dict[str, List[Dict[str, Any]]],
+    judge: Optional[DeepEvalBaseLLM] = None
+):
+    """Evaluate records grouped by chunking strategy.
     
+    Args:
+        strategy_groups: Dictionary mapping strategy names to their records
+        judge: Optional judge model shared across evaluation passes
+    """
     strategies = list(strategy_groups.keys())
     print(f"\nFound {len(strategies)} chunking strategies: {strategies}\n")
     
     # Evaluate each strategy separately
     for strategy, strategy_records in strategy_groups.items():
-        evaluate_records(strategy_records, strategy_name=strategy)
+        evaluate_records(strategy_records, strategy_name=strategy, judge=judge)
 
 
 def main():
@@ -246,31 +354,24 @@ def main():
     print(f"Filter strategy: {FILTER_STRATEGY if FILTER_STRATEGY else 'All strategies'}")
     print()
     
-    # Read log file
-    records = read_log_file(LOG_PATH)
-    if not records:
-        print("No records found. Exiting.")
-        return
-    
-    print(f"Loaded {len(records)} records from log file")
-    
-    # Filter records
-    filtered_records = filter_records(records)
+    # Read and filter log file in a single streaming pass
+    filtered_records = read_log_file(LOG_PATH)
     if not filtered_records:
-        print("No records to evaluate after filtering. Exiting.")
+        print("No records to evaluate. Exiting.")
         return
     
     print(f"Evaluating {len(filtered_records)} records\n")
     
-    # Check if we should group by strategy
-    strategies = {r.get('chunking_strategy') for r in filtered_records}
+    # Build the judge model once; all strategy passes reuse it and its metrics
+    judge = get_judge_model(OLLAMA_MODEL, OLLAMA_BASE_URL)
     
-    if len(strategies) > 1 and FILTER_STRATEGY is None:
+    # Check if we should group by strategy
+    if FILTER_STRATEGY is None and has_multiple_strategies(filtered_records):
         # Multiple strategies - evaluate separately
-        evaluate_by_strategy(filtered_records)
+        evaluate_by_strategy(group_by_strategy(filtered_records), judge=judge)
     else:
         # Single strategy or filtered - evaluate all together
-        evaluate_records(filtered_records)
+        evaluate_records(filtered_records, judge=judge)
     
     print("Evaluation complete!")
 
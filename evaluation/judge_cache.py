@@ -0,0 +1,272 @@
+"""
+Persistent exact-match and semantic cache for LLM judge calls made by DeepEval metrics.
+
+DeepEval metrics send deterministic (temperature=0) judge prompts to Ollama.
+Caching responses by prompt hash means re-running an evaluation over the same
+records or goldens skips every judge call that was already answered.
+
+With a semantic index path (opt-in), prompts that miss the exact-match cache
+are embedded and compared against the embeddings of previously answered
+prompts; a near-identical prompt (cosine similarity above a threshold) reuses
+the stored response. Identical prompts issued concurrently share a single
+in-flight Ollama call.
+"""
+
+import asyncio
+import atexit
+import hashlib
+import os
+import shelve
+import time
+import weakref
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from deepeval.models import OllamaModel
+
+from langchain_ollama import OllamaEmbeddings
+
+from backend.core.embeddings import create_embeddings, get_embeddings
+
+# Default on-disk location of the judge cache (shelve may add file extensions)
+DEFAULT_CACHE_PATH = ".deepeval_cache"
+
+# Suggested on-disk location of the semantic index (kept next to the RAG turn
+# logs); the semantic cache is only used when a path is passed explicitly
+DEFAULT_SEMANTIC_INDEX_PATH = "logs/judge_semantic_index.npz"
+
+# Minimum cosine similarity for a semantic cache hit
+DEFAULT_SIMILARITY_THRESHOLD = 0.97
+
+
+class CachedOllamaModel(OllamaModel):
+    """OllamaModel that caches generate/a_generate results on disk.
+    
+    Cache keys include the model name, temperature, output schema and prompt,
+    so changing any of them results in a fresh judge call. Semantic hits are
+    only considered among prompts with the same model, temperature and schema,
+    and only when semantic_index_path is set. If a prompt can't be embedded,
+    the call falls through to the judge.
+    """
+    
+    def __init__(
+        self,
+        *args,
+        cache_path: str = DEFAULT_CACHE_PATH,
+        semantic_index_path: Optional[str] = None,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self._cache = shelve.open(cache_path)
+        self._semantic_index_path = semantic_index_path
+        self._similarity_threshold = similarity_threshold
+        # New vectors are appended as rows and stacked into a matrix lazily,
+        # on the next lookup, instead of copying the matrix on every store
+        self._vector_rows: List[np.ndarray] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._keys: List[str] = []
+        self._scopes: List[str] = []
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # The async HTTP client of an embeddings instance is bound to the event
+        # loop it was first used on, so each loop gets its own instance
+        self._loop_embeddings: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OllamaEmbeddings]" = (
+            weakref.WeakKeyDictionary()
+        )
+        if semantic_index_path:
+            self._load_semantic_index()
+        atexit.register(self.close)
+    
+    def _scope(self, schema: Optional[Any]) -> str:
+        """Build the scope string shared by all prompts answered the same way."""
+        schema_name = getattr(schema, "__name__", "") if schema is not None else ""
+        return f"{self.get_model_name()}\0{getattr(self, 'temperature', '')}\0{schema_name}"
+    
+    def _cache_key(self, prompt: str, schema: Optional[Any]) -> str:
+        """Build the cache key for a judge call.
+        
+        Args:
+            prompt: Prompt sent to the model
+            schema: Optional output schema class
+        
+        Returns:
+            Hex digest identifying the call
+        """
+        raw = f"{self._scope(schema)}\0{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def _load_semantic_index(self) -> None:
+        """Load prompt embeddings saved by a previous run, if any."""
+        if not os.path.exists(self._semantic_index_path):
+            return
+        try:
+            with np.load(self._semantic_index_path, allow_pickle=False) as data:
+                self._vector_rows = [data["vectors"]]
+                self._keys = data["keys"].tolist()
+                self._scopes = data["scopes"].tolist()
+        except Exception as e:
+            print(f"Warning: Could not load judge semantic index: {e}")
+            self._vector_rows, self._keys, self._scopes = [], [], []
+    
+    def _vector_matrix(self) -> Optional[np.ndarray]:
+        """Return all stored vectors as one matrix, stacking pending rows first."""
+        if self._vector_rows:
+            if self._vectors is not None:
+                self._vector_rows.insert(0, self._vectors)
+            self._vectors = np.vstack(self._vector_rows)
+            self._vector_rows = []
+        return self._vectors
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def _semantic_lookup(self, vector: np.ndarray, scope: str) -> Optional[Any]:
+        """Return the cached response of the most similar prompt, if similar enough.
+        
+        Args:
+            vector: Normalized embedding of the prompt
+            scope: Scope string of the call (see _scope)
+        
+        Returns:
+            Cached response, or None on a miss
+        """
+        vectors = self._vector_matrix()
+        if vectors is None or not self._keys:
+            return None
+        
+        # Vectors are unit length, so the inner product is the cosine similarity
+        similarities = vectors @ vector
+        similarities[np.asarray(self._scopes) != scope] = -1.0
+        best = int(similarities.argmax())
+        if similarities[best] < self._similarity_threshold:
+            return None
+        return self._cache.get(self._keys[best])
+    
+    def _store(self, key: str, scope: str, vector: Optional[np.ndarray], result: Any) -> None:
+        """Store a judge response in the exact-match cache and the semantic index."""
+        self._cache[key] = result
+        if vector is None:
+            return
+        self._vector_rows.append(vector[np.newaxis, :])
+        self._keys.append(key)
+        self._scopes.append(scope)
+    
+    def warm_up(self) -> None:
+        """Load the judge model into Ollama with a tiny uncached request.
+        
+        The first request to a model makes Ollama load it into memory; doing
+        that up front keeps the cold start out of the first test case.
+        """
+        start = time.perf_counter()
+        try:
+            super().generate("ok")
+        except Exception as e:
+            print(f"Warning: Judge model warm-up failed: {e}")
+            return
+        print(f"Warmed up judge model {self.get_model_name()} in {time.perf_counter() - start:.2f}s")
+    
+    def generate(self, prompt: str, schema: Optional[Any] = None):
+        key = self._cache_key(prompt, schema)
+        if key in self._cache:
+            return self._cache[key]
+        
+        scope = self._scope(schema)
+        vector = None
+        if self._semantic_index_path:
+            try:
+                vector = self._normalize(get_embeddings().embed_query(prompt))
+            except Exception as e:
+                print(f"Warning: Could not embed judge prompt, skipping semantic cache: {e}")
+            if vector is not None:
+                cached = self._semantic_lookup(vector, scope)
+                if cached is not None:
+                    return cached
+        
+        result = super().generate(prompt, schema=schema)
+        self._store(key, scope, vector, result)
+        return result
+    
+    async def a_generate(self, prompt: str, schema: Optional[Any] = None):
+        key = self._cache_key(prompt, schema)
+        if key in self._cache:
+            return self._cache[key]
+        
+        # Join an identical call that is already waiting on Ollama
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._a_generate_uncached(key, prompt, schema)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures are not reported as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+    
+    def _get_loop_embeddings(self) -> OllamaEmbeddings:
+        """Return the embeddings instance for the running event loop."""
+        loop = asyncio.get_running_loop()
+        embeddings = self._loop_embeddings.get(loop)
+        if embeddings is None:
+            embeddings = self._loop_embeddings[loop] = create_embeddings()
+        return embeddings
+    
+    async def _a_generate_uncached(self, key: str, prompt: str, schema: Optional[Any]):
+        """Answer a prompt via the semantic index or Ollama, and cache the result."""
+        scope = self._scope(schema)
+        vector = None
+        if self._semantic_index_path:
+            try:
+                vector = self._normalize(await self._get_loop_embeddings().aembed_query(prompt))
+            except Exception as e:
+                print(f"Warning: Could not embed judge prompt, skipping semantic cache: {e}")
+            if vector is not None:
+                cached = self._semantic_lookup(vector, scope)
+                if cached is not None:
+                    return cached
+        
+        result = await super().a_generate(prompt, schema=schema)
+        self._store(key, scope, vector, result)
+        return result
+    
+    def _save_semantic_index(self) -> None:
+        """Persist prompt embeddings so later runs can reuse them."""
+        vectors = self._vector_matrix()
+        if not self._semantic_index_path or vectors is None:
+            return
+        directory = os.path.dirname(self._semantic_index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(
+            self._semantic_index_path,
+            vectors=vectors,
+            keys=np.asarray(self._keys),
+            scopes=np.asarray(self._scopes),
+        )
+    
+    def close(self) -> None:
+        """Persist the semantic index and flush and close the on-disk cache."""
+        try:
+            self._save_semantic_index()
+        except Exception as e:
+            print(f"Warning: Could not save judge semantic index: {e}")
+        try:
+            self._cache.close()
+        except Exception:
+            # Already closed
+            pass
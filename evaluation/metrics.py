@@ -0,0 +1,205 @@
+"""
+Shared judge model, DeepEval metric instances and evaluation loop for the
+evaluation scripts.
+"""
+
+import asyncio
+import functools
+import os
+from collections import defaultdict
+from typing import Dict, List
+
+import orjson
+from deepeval.metrics import BaseMetric
+from deepeval.models import DeepEvalBaseLLM
+from deepeval.test_case import LLMTestCase
+
+from evaluation.judge_cache import DEFAULT_SEMANTIC_INDEX_PATH, CachedOllamaModel
+from evaluation.score_cache import load_scores, save_scores, score_key, test_case_key
+from evaluation.score_stats import RunningStats
+
+# The semantic judge cache (reusing answers of near-identical prompts) is opt-in
+SEMANTIC_JUDGE_CACHE = os.getenv("DEEPEVAL_SEMANTIC_CACHE", "false").lower() == "true"
+
+# Per-test-case scores are appended here as they finish
+SCORES_LOG_PATH = "logs/deepeval_scores.jsonl"
+
+# Maximum number of test cases evaluated concurrently. Judge calls are I/O-bound
+# on the Ollama server, so throughput scales with its parallel slots
+# (OLLAMA_NUM_PARALLEL) rather than with local processes; raise both together.
+CONCURRENCY = int(os.getenv("DEEPEVAL_CONCURRENCY", "8"))
+
+
+@functools.lru_cache(maxsize=None)
+def get_metric(metric_class: type, model: DeepEvalBaseLLM, slot: int) -> BaseMetric:
+    """Return the metric instance for a judge model and concurrency slot.
+    
+    Metrics keep per-measure state, so concurrent test cases each need their
+    own instance; a slot identifies one of those instances. Instances are
+    built once per process and reused by every later evaluation pass (e.g.
+    one pass per chunking strategy).
+    
+    Args:
+        metric_class: DeepEval metric class
+        model: Judge model the metric uses
+        slot: Index of the concurrency slot the instance belongs to
+    
+    Returns:
+        Metric instance
+    """
+    return metric_class(model=model)
+
+
+@functools.lru_cache(maxsize=None)
+def get_judge_model(model_name: str, base_url: str) -> CachedOllamaModel:
+    """Return the shared judge model for an Ollama model and server.
+    
+    The judge model owns the on-disk response cache, so building it once per
+    process also keeps a single handle on that cache. The semantic cache is
+    only enabled with DEEPEVAL_SEMANTIC_CACHE=true. The model is warmed up
+    on creation so Ollama's model load does not stall the first test case.
+    
+    Args:
+        model_name: Ollama model used as the judge
+        base_url: Ollama server URL
+    
+    Returns:
+        CachedOllamaModel instance
+    """
+    judge = CachedOllamaModel(
+        model=model_name,
+        base_url=base_url,
+        temperature=0,
+        semantic_index_path=DEFAULT_SEMANTIC_INDEX_PATH if SEMANTIC_JUDGE_CACHE else None,
+    )
+    judge.warm_up()
+    return judge
+
+
+def is_evaluable(test_case: LLMTestCase) -> bool:
+    """Check whether a test case has the fields the metrics need to judge it.
+    
+    Test cases from failed RAG queries have an empty answer or no retrieved
+    context; judging them would cost an Ollama call per metric for no score.
+    
+    Args:
+        test_case: LLMTestCase to check
+    
+    Returns:
+        True if the test case has an input, an answer and retrieved context
+    """
+    return bool(test_case.input and test_case.actual_output and test_case.retrieval_context)
+
+
+async def evaluate_test_cases(
+    test_cases: List[LLMTestCase],
+    metric_classes: List[type],
+    judge: DeepEvalBaseLLM,
+    model_name: str
+) -> Dict[str, RunningStats]:
+    """Evaluate test cases using DeepEval metrics with an Ollama judge.
+    
+    All metrics for a test case are measured concurrently via DeepEval's async
+    API, and up to CONCURRENCY test cases are evaluated at the same time.
+    
+    Each newly measured score is also appended to SCORES_LOG_PATH as soon as
+    its test case finishes, so progress survives an interrupted run. Test
+    cases that are not evaluable (see is_evaluable) are counted and reported
+    separately instead of being scored.
+    
+    Args:
+        test_cases: List of LLMTestCase objects
+        metric_classes: DeepEval metric classes to measure
+        judge: Judge model the metrics use
+        model_name: Name of the judge model (part of the score cache keys)
+    
+    Returns:
+        Dictionary mapping metric names to running score statistics
+    """
+    # Running statistics for each metric (constant memory per metric)
+    metric_scores = defaultdict(RunningStats)
+    
+    # Evaluate test cases concurrently, bounded so the Ollama server is not overloaded
+    print(f"Evaluating test cases using Ollama model: {model_name} (concurrency: {CONCURRENCY})...")
+    # Pre-instantiate one metric set per concurrent slot. A set is checked out of
+    # the pool for the duration of a test case, which also bounds concurrency.
+    metric_pool: asyncio.Queue = asyncio.Queue()
+    for slot in range(CONCURRENCY):
+        metric_pool.put_nowait([
+            (metric_class.__name__, get_metric(metric_class, judge, slot))
+            for metric_class in metric_classes
+        ])
+    metric_names = [metric_class.__name__ for metric_class in metric_classes]
+    
+    # Scores from previous runs; only missing (test case, metric) pairs are measured
+    score_cache = load_scores()
+    completed = 0
+    
+    # Identical test cases are judged once and their scores shared
+    case_keys = [test_case_key(test_case) for test_case in test_cases]
+    unique_cases: Dict[str, LLMTestCase] = {}
+    for case_key, test_case in zip(case_keys, test_cases):
+        unique_cases.setdefault(case_key, test_case)
+    if len(unique_cases) < len(test_cases):
+        print(f"  {len(test_cases) - len(unique_cases)} duplicate test cases will reuse scores")
+    
+    async def run_case(case_key: str, test_case: LLMTestCase):
+        nonlocal completed
+        if not is_evaluable(test_case):
+            # Degenerate test cases are skipped without a judge call and kept
+            # out of the statistics, so they don't skew the metric averages
+            return {}
+        
+        scores = {
+            metric_name: score_cache.get(score_key(case_key, metric_name, model_name))
+            for metric_name in metric_names
+        }
+        
+        if any(score is None for score in scores.values()):
+            metrics = await metric_pool.get()
+            try:
+                pending = [(metric_name, metric) for metric_name, metric in metrics if scores[metric_name] is None]
+                # Measure all missing metrics for this test case concurrently
+                results = await asyncio.gather(
+                    *[metric.a_measure(test_case) for _, metric in pending],
+                    return_exceptions=True
+                )
+                # Read scores before the metric set is handed to the next test case
+                for (metric_name, metric), result in zip(pending, results):
+                    scores[metric_name] = result if isinstance(result, Exception) else metric.score
+            finally:
+                metric_pool.put_nowait(metrics)
+            
+            # Stream newly measured scores to the JSONL score log
+            scores_log.write(b"".join(
+                orjson.dumps({'test_case': case_key, 'metric': metric_name, 'model': model_name, 'score': score}) + b"\n"
+                for metric_name, score in scores.items()
+                if score is not None and not isinstance(score, Exception)
+            ))
+        
+        completed += 1
+        if completed % 10 == 0:
+            print(f"  Processed {completed}/{len(unique_cases)} unique test cases...")
+        return scores
+    
+    os.makedirs(os.path.dirname(SCORES_LOG_PATH), exist_ok=True)
+    with open(SCORES_LOG_PATH, 'ab') as scores_log:
+        case_results = await asyncio.gather(*[run_case(case_key, test_case) for case_key, test_case in unique_cases.items()])
+    scores_by_key = dict(zip(unique_cases.keys(), case_results))
+    
+    # Aggregate scores in test case order, broadcasting to duplicates
+    for i, case_key in enumerate(case_keys):
+        for metric_name, score in scores_by_key[case_key].items():
+            if isinstance(score, Exception):
+                print(f"  Warning: Failed to evaluate {metric_name} for test case {i+1}: {score}")
+                continue
+            if score is not None:
+                metric_scores[metric_name].add(score)
+                score_cache[score_key(case_key, metric_name, model_name)] = score
+    
+    save_scores(score_cache)
+    skipped = sum(1 for case_key in case_keys if not scores_by_key[case_key])
+    if skipped:
+        print(f"  Skipped {skipped} test cases with empty answer or context (not scored)")
+    print(f"Completed evaluation of {len(test_cases)} test cases\n")
+    return dict(metric_scores)
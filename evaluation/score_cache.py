@@ -0,0 +1,73 @@
+"""
+Persistent cache of DeepEval metric scores for incremental re-evaluation.
+
+Scores are keyed by a hash of the test case contents together with the metric
+and judge model names, so re-running an evaluation over a log file that only
+gained a few new records measures the new records only.
+"""
+
+import hashlib
+import os
+from typing import Dict
+
+import orjson
+from deepeval.test_case import LLMTestCase
+
+# Default on-disk location of the score cache
+DEFAULT_SCORES_PATH = ".deepeval_scores.json"
+
+
+def test_case_key(test_case: LLMTestCase) -> str:
+    """Build a stable identifier for the contents of a test case.
+    
+    Args:
+        test_case: Test case to identify
+    
+    Returns:
+        Hex digest of the test case fields used by the metrics
+    """
+    payload = orjson.dumps([
+        test_case.input,
+        test_case.actual_output,
+        test_case.expected_output,
+        test_case.retrieval_context,
+        test_case.context,
+    ])
+    return hashlib.sha256(payload).hexdigest()
+
+
+def score_key(case_key: str, metric_name: str, model_name: str) -> str:
+    """Build the cache key for one metric score of one test case."""
+    return f"{case_key}:{metric_name}:{model_name}"
+
+
+def load_scores(scores_path: str = DEFAULT_SCORES_PATH) -> Dict[str, float]:
+    """Load cached scores from a previous run.
+    
+    Args:
+        scores_path: Path to the score cache file
+    
+    Returns:
+        Dictionary mapping score keys to scores (empty if no usable cache exists)
+    """
+    if not os.path.exists(scores_path):
+        return {}
+    try:
+        with open(scores_path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError) as e:
+        print(f"Warning: Ignoring unreadable score cache {scores_path}: {e}")
+        return {}
+
+
+def save_scores(scores: Dict[str, float], scores_path: str = DEFAULT_SCORES_PATH) -> None:
+    """Write scores to the cache file atomically.
+    
+    Args:
+        scores: Dictionary mapping score keys to scores
+        scores_path: Path to the score cache file
+    """
+    temp_path = f"{scores_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(orjson.dumps(scores))
+    os.replace(temp_path, scores_path)
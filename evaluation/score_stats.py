@@ -0,0 +1,45 @@
+"""
+Online summary statistics for streams of metric scores.
+"""
+
+import math
+from typing import Dict
+
+
+class RunningStats:
+    """Running mean, sample standard deviation, min and max of a score stream.
+    
+    Uses Welford's algorithm, so memory stays constant no matter how many
+    scores are added.
+    """
+    
+    __slots__ = ("n", "mean", "_m2", "min", "max")
+    
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, score: float) -> None:
+        """Add one score to the statistics."""
+        self.n += 1
+        delta = score - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (score - self.mean)
+        if score < self.min:
+            self.min = score
+        if score > self.max:
+            self.max = score
+    
+    def summary(self) -> Dict[str, float]:
+        """Return mean, std, min and max (empty if no scores were added)."""
+        if not self.n:
+            return {}
+        return {
+            'mean': self.mean,
+            'std': math.sqrt(self._m2 / (self.n - 1)) if self.n > 1 else 0.0,
+            'min': self.min,
+            'max': self.max,
+        }
@@ -4,10 +4,13 @@ Logs each RAG turn to a JSONL file for offline evaluation.
 """
 
 import os
-import json
+import queue
+import atexit
 import logging
-from datetime import datetime
-from typing import List, Optional
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
 from pydantic import BaseModel, Field
 
 # Configure standard logging
@@ -16,6 +19,21 @@ logger = logging.getLogger(__name__)
 # Default log file path
 DEFAULT_LOG_PATH = "logs/rag_turns.jsonl"
 
+# Maximum number of records waiting for the background writer
+LOG_QUEUE_MAXSIZE = 10000
+
+# Seconds to wait for pending records to be written at interpreter exit
+LOG_SHUTDOWN_TIMEOUT = 5.0
+
+# Records waiting to be written: (log_path, record_json), or None to stop the writer
+_log_queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+_writer_thread: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+# Nanoseconds per day, and the "YYYY-MM-DDT" prefix of the current UTC day
+_NS_PER_DAY = 86_400_000_000_000
+_date_prefix_cache: Tuple[int, str] = (-1, "")
+
 
 class RagTurnLogRecord(BaseModel):
     """Pydantic model for RAG turn log record."""
@@ -44,34 +62,135 @@ def ensure_log_directory(log_path: str) -> None:
         log_path: Path to the log file
     """
     log_dir = os.path.dirname(log_path)
-    if log_dir and not os.path.exists(log_dir):
+    if log_dir:
         try:
-            os.makedirs(log_dir, exist_ok=True)
+            Path(log_dir).mkdir(parents=True, exist_ok=True)
         except OSError as e:
             logger.error(f"Failed to create log directory {log_dir}: {e}")
 
 
+# Create the log directory once at import; the writer thread only repeats this
+# when RAG_LOG_PATH is changed to point somewhere else at runtime
+_startup_log_path = get_log_path()
+ensure_log_directory(_startup_log_path)
+
+
+def _utc_timestamp() -> str:
+    """Format the current UTC time as an ISO 8601 string with a "Z" suffix.
+    
+    Equivalent to datetime.utcnow().isoformat() + "Z" (always with
+    microseconds), but only formats the date part once per day and avoids
+    allocating a datetime object on every turn.
+    
+    Returns:
+        Timestamp such as "2024-01-01T12:00:00.000000Z"
+    """
+    global _date_prefix_cache
+    
+    now_ns = time.time_ns()
+    day, ns_of_day = divmod(now_ns, _NS_PER_DAY)
+    cached_day, prefix = _date_prefix_cache
+    if day != cached_day:
+        prefix = time.strftime("%Y-%m-%dT", time.gmtime(day * 86_400))
+        # Tuple assignment is atomic, so concurrent callers never see a torn cache
+        _date_prefix_cache = (day, prefix)
+    
+    seconds, ns = divmod(ns_of_day, 1_000_000_000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return f"{prefix}{hour:02d}:{minute:02d}:{second:02d}.{ns // 1000:06d}Z"
+
+
+def _drain_log_queue() -> None:
+    """Write queued records to their log files (background writer thread).
+    
+    Keeps the log file open between records and flushes whenever the queue
+    runs empty, so bursts of turns are written in one buffered batch. After
+    a failed open or write the file is reopened for the next record.
+    """
+    log_file = None
+    current_path = None
+    
+    while True:
+        item = _log_queue.get()
+        try:
+            if item is None:
+                break
+            
+            log_path, record_json = item
+            if log_path != current_path:
+                if log_file is not None:
+                    log_file.close()
+                if log_path != _startup_log_path:
+                    ensure_log_directory(log_path)
+                log_file = open(log_path, "a", encoding="utf-8", buffering=1 << 16)
+                current_path = log_path
+            
+            log_file.write(record_json + "\n")
+            if _log_queue.empty():
+                log_file.flush()
+        except Exception as e:
+            # Log error but keep the writer alive for later records
+            logger.error(f"Failed to write RAG turn log: {e}", exc_info=True)
+            # Drop the (possibly broken) handle so the next record reopens the file
+            if log_file is not None:
+                try:
+                    log_file.close()
+                except Exception:
+                    pass
+            log_file = None
+            current_path = None
+        finally:
+            _log_queue.task_done()
+    
+    if log_file is not None:
+        log_file.close()
+
+
+def _ensure_writer_thread() -> None:
+    """Start the background log writer thread if it is not running."""
+    global _writer_thread
+    
+    if _writer_thread is not None and _writer_thread.is_alive():
+        return
+    
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_drain_log_queue, name="rag-log-writer", daemon=True)
+            _writer_thread.start()
+
+
+def _flush_and_close() -> None:
+    """Stop the writer thread after pending records are written."""
+    if _writer_thread is None or not _writer_thread.is_alive():
+        return
+    try:
+        _log_queue.put(None, timeout=LOG_SHUTDOWN_TIMEOUT)
+    except queue.Full:
+        logger.error("RAG turn log queue is full at shutdown; pending records may be lost")
+        return
+    _writer_thread.join(timeout=LOG_SHUTDOWN_TIMEOUT)
+
+
+atexit.register(_flush_and_close)
+
+
 def log_rag_turn(record: RagTurnLogRecord) -> None:
     """Log a RAG turn to JSONL file.
     
-    This function is non-blocking and failure-tolerant. If logging fails,
-    it logs an error but does not raise an exception.
+    This function is non-blocking and failure-tolerant. The record is handed
+    to a background writer thread, which appends it to the log file; if
+    logging fails, an error is logged but no exception is raised.
     
     Args:
         record: RAG turn log record to write
     """
     try:
-        log_path = get_log_path()
-        ensure_log_directory(log_path)
-        
-        # Convert record to dict and serialize to JSON
-        record_dict = record.model_dump()
-        json_line = json.dumps(record_dict, ensure_ascii=False)
-        
-        # Append to log file (append mode)
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(json_line + "\n")
-            
+        _ensure_writer_thread()
+        # Serialize on the caller's thread with Pydantic's native JSON encoder
+        _log_queue.put_nowait((get_log_path(), record.model_dump_json()))
+    except queue.Full:
+        logger.error("RAG turn log queue is full; dropping log record")
     except Exception as e:
         # Log error but don't raise - logging failures should not break requests
         logger.error(f"Failed to log RAG turn: {e}", exc_info=True)
@@ -88,6 +207,9 @@ def create_log_record(
 ) -> RagTurnLogRecord:
     """Create a RAG turn log record.
     
+    Fields come from the chat route rather than user-supplied JSON, so the
+    record is built with model_construct and skips Pydantic validation.
+    
     Args:
         conversation_id: Unique conversation identifier
         turn_index: Turn index within conversation
@@ -101,9 +223,9 @@ def create_log_record(
         RagTurnLogRecord instance
     """
     if timestamp is None:
-        timestamp = datetime.utcnow().isoformat() + "Z"
+        timestamp = _utc_timestamp()
     
-    return RagTurnLogRecord(
+    return RagTurnLogRecord.model_construct(
         timestamp=timestamp,
         conversation_id=conversation_id,
         turn_index=turn_index,
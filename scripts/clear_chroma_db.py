@@ -4,21 +4,27 @@ Standalone script to clear all data from ChromaDB and optionally Supabase.
 
 This script:
 1. Resets the global vectorstore cache
-2. Deletes the existing ChromaDB collection
-3. Optionally (with --full): deletes the entire ChromaDB directory AND clears Supabase registry
+2. Deletes every chunk from the ChromaDB collection (in ID batches), or deletes
+   and recreates the collection when its HNSW settings differ from the config
+3. Optionally (with --full): deletes the entire ChromaDB directory, clears the Supabase
+   registry AND deletes the on-disk chunk cache, so re-ingested files are parsed again
 
-Note: The collection and directory are NOT recreated. They will be automatically
+Note: With --full the directory is NOT recreated. It will be automatically
 created by get_vectorstore() when needed.
 
 Usage:
     python clear_chroma_db.py           # Clear cache and collection only
-    python clear_chroma_db.py --full    # Also delete database directory and clear Supabase
+    python clear_chroma_db.py --full    # Also delete database directory, Supabase registry and chunk cache
 """
 
 import os
 import sys
 import shutil
-import argparse
+import asyncio
+import stat
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv  # Import load_dotenv
 
@@ -31,6 +37,23 @@ if str(project_root) not in sys.path:
 # Load environment variables from .env file
 load_dotenv(project_root / ".env")
 
+USAGE = """usage: clear_chroma_db.py [-h] [--full] [--force]
+
+Clear ChromaDB data (cache, collection, and optionally directory and Supabase)
+
+options:
+  -h, --help  show this help message and exit
+  --full      Also delete entire database directory, clear Supabase registry and the chunk cache (more thorough, but slower)
+  --force     Skip confirmation prompt
+
+Examples:
+  python clear_chroma_db.py           # Clear cache and collection only (recommended)
+  python clear_chroma_db.py --full    # Also delete database directory, Supabase registry and chunk cache"""
+
+# Number of chunk IDs fetched and deleted per call when emptying the collection
+# (keeps each delete well below SQLite's bound-variable limit)
+DELETE_BATCH_SIZE = 5000
+
 
 def clear_cache():
     """Reset the global vectorstore cache instance."""
@@ -58,32 +81,89 @@ def clear_cache():
         return False
 
 
-def clear_collection():
-    """Clear the ChromaDB collection programmatically."""
+def clear_chunk_cache():
+    """Delete the on-disk cache of loaded and chunked files."""
     try:
-        from backend.core.embeddings import get_embeddings
-        from backend.core.vectorstore import get_vectorstore
-        
-        print("Initializing ChromaDB connection...")
-        
-        # Initialize embeddings (needed for ChromaDB)
-        embeddings = get_embeddings()
+        from backend.processing.chunk_cache import reset_chunk_cache
         
-        # Connect to existing ChromaDB instance
-        vectordb = get_vectorstore()
+        print("Deleting chunk cache...")
+        reset_chunk_cache()
+        print("✓ Chunk cache deleted successfully")
+        return True
+    except ModuleNotFoundError as e:
+        if "backend" in str(e):
+            print(f"❌ Error: Cannot find backend module: {e}")
+            print("Make sure you're running this script from the project root or that the project root is in PYTHONPATH")
+        else:
+            print(f"❌ Error: Missing required package: {e}")
+        return False
+    except ImportError as e:
+        print(f"❌ Error: Missing required package: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Error deleting chunk cache: {e}")
+        return False
+
+
+def clear_collection(recreate=True):
+    """Clear the ChromaDB collection programmatically.
+    
+    If the collection already uses the configured HNSW settings, its chunks are
+    deleted in ID batches and the collection itself (with its segment files) is
+    kept. Otherwise the collection is dropped and, by default, recreated empty
+    right away with the configured settings, so the next upload or query does
+    not pay for creating it.
+    
+    Args:
+        recreate: Whether to recreate the empty collection (pointless when the
+                  database directory is deleted afterwards)
+    """
+    try:
+        from backend.core.config import VECTOR_DB_COLLECTION_METADATA, VECTOR_DB_COLLECTION_NAME
+        from backend.core.vectorstore import get_chroma_client
         
-        print("Deleting collection...")
+        print("Initializing ChromaDB connection...")
         
-        # Delete the collection
+        # Deleting data needs no embedding function, so use the raw Chroma
+        # client instead of building the LangChain vectorstore and embeddings
+        client = get_chroma_client()
         try:
-            vectordb.delete_collection()
-            print("✓ Collection deleted successfully")
+            collection = client.get_collection(VECTOR_DB_COLLECTION_NAME, embedding_function=None)
         except Exception as e:
             error_msg = str(e).lower()
             if "does not exist" in error_msg or "not found" in error_msg:
-                print("⚠ Collection does not exist (may already be empty)")
+                collection = None
             else:
                 raise
+        
+        if collection is None:
+            print("⚠ Collection does not exist (may already be empty)")
+        elif recreate and all(
+            (collection.metadata or {}).get(k) == v for k, v in VECTOR_DB_COLLECTION_METADATA.items()
+        ):
+            # Keep the collection when its HNSW settings are already the configured ones
+            print("Deleting all chunks from collection...")
+            deleted_count = 0
+            while True:
+                ids = collection.get(limit=DELETE_BATCH_SIZE, include=[])["ids"]
+                if not ids:
+                    break
+                collection.delete(ids=ids)
+                deleted_count += len(ids)
+            print(f"✓ Deleted {deleted_count} chunk(s) from collection")
+            return True
+        else:
+            print("Deleting collection...")
+            client.delete_collection(VECTOR_DB_COLLECTION_NAME)
+            print("✓ Collection deleted successfully")
+        
+        # Recreate it empty with the tuned HNSW settings
+        if recreate:
+            client.create_collection(
+                name=VECTOR_DB_COLLECTION_NAME,
+                metadata=VECTOR_DB_COLLECTION_METADATA
+            )
+            print("✓ Collection recreated with configured HNSW settings")
         return True
         
     except ModuleNotFoundError as e:
@@ -103,6 +183,89 @@ def clear_collection():
         return False
 
 
+def _scandir_rmtree(path):
+    """Recursively delete a directory using os.scandir.
+    
+    DirEntry caches the file type from the directory listing, so no extra
+    stat call is needed per entry.
+    
+    Args:
+        path: Directory to delete
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _scandir_rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
+
+def _rmtree_one(path):
+    """Delete a single directory tree as fast as the platform allows.
+    
+    Prefers the system `rm -rf`, falls back to an os.scandir walker, and
+    finally to shutil.rmtree (which also handles read-only files on Windows).
+    
+    Args:
+        path: Directory to delete
+    """
+    rm = shutil.which("rm")
+    if rm is not None and os.name == "posix":
+        result = subprocess.run([rm, "-rf", "--", str(path)], capture_output=True)
+        if result.returncode == 0:
+            return
+    
+    try:
+        _scandir_rmtree(path)
+        return
+    except OSError:
+        pass
+    
+    shutil.rmtree(path)
+
+
+def _fast_rmtree(path):
+    """Delete a directory tree, removing its top-level subdirectories in parallel.
+    
+    A Chroma persist directory holds chroma.sqlite3 plus one directory per
+    collection segment; the segment directories are independent, so they are
+    deleted concurrently in worker processes before the rest of the tree.
+    
+    Args:
+        path: Directory to delete
+    """
+    with os.scandir(path) as entries:
+        subdirs = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+    
+    if len(subdirs) > 1:
+        max_workers = min(len(subdirs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_rmtree_one, subdirs))
+    
+    _rmtree_one(path)
+
+
+def _delete_in_background(path):
+    """Delete a directory tree in a detached process that outlives this script.
+    
+    Args:
+        path: Directory to delete
+    """
+    rm = shutil.which("rm")
+    if rm is not None and os.name == "posix":
+        command = [rm, "-rf", "--", str(path)]
+    else:
+        command = [sys.executable, "-c", "import shutil, sys; shutil.rmtree(sys.argv[1], ignore_errors=True)", str(path)]
+    subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
 def delete_directory():
     """Delete the entire ChromaDB directory."""
     try:
@@ -110,12 +273,28 @@ def delete_directory():
         
         db_path = Path(VECTOR_DB_PATH)
         
-        if not db_path.exists():
+        # One lstat answers both "does it exist" and "is it a real directory"
+        try:
+            st = os.lstat(db_path)
+        except FileNotFoundError:
             print(f"⚠ Database directory does not exist: {VECTOR_DB_PATH}")
             return True
+        if not stat.S_ISDIR(st.st_mode):
+            # Like shutil.rmtree, refuse symlinks and plain files
+            print(f"❌ Error: Database path is not a directory: {VECTOR_DB_PATH}")
+            return False
         
         print(f"Deleting database directory: {VECTOR_DB_PATH}")
-        shutil.rmtree(db_path)
+        # Move the directory out of the way (a single rename) and delete it in
+        # the background, so the script does not wait on the size of the database
+        trash_path = db_path.with_name(f"{db_path.name}.trash-{os.getpid()}-{time.time_ns()}")
+        try:
+            os.rename(db_path, trash_path)
+        except OSError as e:
+            print(f"⚠ Could not move directory aside ({e}); deleting in place")
+            _fast_rmtree(db_path)
+        else:
+            _delete_in_background(trash_path)
         print("✓ Database directory deleted successfully")
         # Note: Directory will be recreated automatically by get_vectorstore() when needed
         
@@ -197,31 +376,37 @@ def clear_supabase():
         return False
 
 
-def main():
-    """Main function."""
-    parser = argparse.ArgumentParser(
-        description="Clear ChromaDB data (cache, collection, and optionally directory and Supabase)",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  python clear_chroma_db.py           # Clear cache and collection only (recommended)
-  python clear_chroma_db.py --full    # Also delete database directory and clear Supabase
-        """
-    )
+async def _clear_directory_and_supabase():
+    """Delete the database directory and clear Supabase concurrently.
     
-    parser.add_argument(
-        "--full",
-        action="store_true",
-        help="Also delete entire database directory and clear Supabase registry (more thorough, but slower)"
-    )
+    The local directory delete and the Supabase round-trip are independent,
+    so they run in worker threads at the same time.
     
-    parser.add_argument(
-        "--force",
-        action="store_true",
-        help="Skip confirmation prompt"
+    Returns:
+        True if both steps succeeded
+    """
+    results = await asyncio.gather(
+        asyncio.to_thread(delete_directory),
+        asyncio.to_thread(clear_supabase)
     )
-    
-    args = parser.parse_args()
+    return all(results)
+
+
+def main():
+    """Main function."""
+    # Two boolean flags only, so sys.argv is checked directly instead of
+    # importing and building an argparse parser
+    flags = sys.argv[1:]
+    if "-h" in flags or "--help" in flags:
+        print(USAGE)
+        sys.exit(0)
+    unknown = [flag for flag in flags if flag not in ("--full", "--force")]
+    if unknown:
+        print(f"Unrecognized arguments: {' '.join(unknown)}\n")
+        print(USAGE)
+        sys.exit(2)
+    full = "--full" in flags
+    force = "--force" in flags
     
     print("=" * 60)
     print("ChromaDB Data Clearing Script")
@@ -229,8 +414,8 @@ Examples:
     print()
     
     # Confirmation prompt
-    if not args.force:
-        action = "clear cache, collection, delete the database directory, and clear Supabase registry" if args.full else "clear cache and collection"
+    if not force:
+        action = "clear cache, collection, delete the database directory and chunk cache, and clear Supabase registry" if full else "clear cache and collection"
         response = input(f"Are you sure you want to {action}? (yes/no): ").strip().lower()
         
         if response not in ["yes", "y"]:
@@ -242,7 +427,7 @@ Examples:
     success = True
     
     # Step 1: Clear collection (while we have a valid connection)
-    if not clear_collection():
+    if not clear_collection(recreate=not full):
         success = False
     print()
     
@@ -251,25 +436,26 @@ Examples:
         success = False
     print()
     
-    # Step 3: Optionally delete directory
-    if args.full:
-        if not delete_directory():
+    # Steps 3-4: Optionally delete directory and clear Supabase registry (only with --full)
+    if full:
+        if not asyncio.run(_clear_directory_and_supabase()):
             success = False
         print()
         
-        # Step 4: Clear Supabase registry (only with --full)
-        if not clear_supabase():
+        # Step 5: Delete cached chunks, so re-ingested files are parsed from scratch
+        if not clear_chunk_cache():
             success = False
         print()
     
     print("=" * 60)
     if success:
-        if args.full:
-            print("✓ ChromaDB and Supabase cleared successfully!")
+        if full:
+            print("✓ ChromaDB, Supabase and chunk cache cleared successfully!")
         else:
             print("✓ ChromaDB cleared successfully!")
-        print("Note: Collection and directory will be recreated automatically")
-        print("      by get_vectorstore() when needed.")
+        if full:
+            print("Note: The database directory will be recreated automatically")
+            print("      by get_vectorstore() when needed.")
     else:
         print("❌ Failed to clear data")
         sys.exit(1)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Standalone script to index local files in bulk without going through the API.
+
+Files are loaded and chunked concurrently with RAG_INGEST_WORKERS workers
+(threads by default, processes with RAG_INGEST_PROCESSES=true), then indexed
+together in batches, exactly like a batch upload.
+
+Usage:
+    python scripts/ingest_files.py docs/a.pdf docs/b.txt
+    python scripts/ingest_files.py docs/*.pdf --conversation-id <id>
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Ensure project root is in Python path before importing backend modules
+# Script is in scripts/ directory, so project root is parent.parent
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Load environment variables from .env file
+load_dotenv(project_root / ".env")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Load, chunk and index local files concurrently"
+    )
+    
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="Files to index (.pdf, .docx, .doc, .xlsx, .xls, .txt)"
+    )
+    
+    parser.add_argument(
+        "--conversation-id",
+        default=None,
+        help="Associate the files with a chat session"
+    )
+    
+    args = parser.parse_args()
+    
+    from backend.services.document_service import process_and_index_files
+    
+    statuses = process_and_index_files(args.paths, conversation_id=args.conversation_id)
+    
+    failed = 0
+    for path, status in zip(args.paths, statuses):
+        if status.startswith("Error"):
+            failed += 1
+            print(f"❌ {path}: {status}")
+        else:
+            print(f"✓ {path}: {status}")
+    
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,25 @@ Run this after starting the API server to test logging.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import orjson
 import os
 import time
+from collections import deque
 from pathlib import Path
 
 API_BASE_URL = "http://localhost:8000"
 LOG_PATH = os.getenv("RAG_LOG_PATH", "logs/rag_turns.jsonl")
 
+# Number of most recent log entries parsed and displayed by check_log_file
+LOG_DISPLAY_ENTRIES = 20
+
+# Shared session so every request reuses the same keep-alive connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 
 def test_chat_request(question: str, conversation_id: str = None, turn_index: int = None):
     """Send a test chat request."""
@@ -27,7 +38,7 @@ def test_chat_request(question: str, conversation_id: str = None, turn_index: in
     print(f"\n📤 Sending request: {json.dumps(payload, indent=2)}")
     
     try:
-        response = requests.post(url, json=payload, timeout=30)
+        response = SESSION.post(url, json=payload, timeout=30)
         response.raise_for_status()
         data = response.json()
         print(f"✅ Response received: {len(data.get('answer', ''))} characters")
@@ -37,8 +48,48 @@ def test_chat_request(question: str, conversation_id: str = None, turn_index: in
         return None
 
 
-def check_log_file():
-    """Check if log file exists and display its contents."""
+def get_log_size() -> int:
+    """Return the current log file size in bytes (0 if it does not exist yet)."""
+    try:
+        return os.stat(LOG_PATH).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def wait_for_log_growth(prev_size: int, timeout: float = 5.0) -> bool:
+    """Wait until the log file grows past prev_size.
+    
+    Polls with exponential backoff starting at 10 ms, so the wait ends as soon
+    as the server's background writer has flushed the new record.
+    
+    Returns:
+        True if the log grew before the timeout
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while time.monotonic() < deadline:
+        if get_log_size() > prev_size:
+            return True
+        time.sleep(delay)
+        delay = min(delay * 1.5, 0.2)
+    print(f"⚠️  No new log record after {timeout:.0f}s")
+    return False
+
+
+def chat_and_wait_for_log(question: str, conversation_id: str = None, turn_index: int = None):
+    """Send a test chat request and wait for its log record to be written."""
+    prev_size = get_log_size()
+    data = test_chat_request(question, conversation_id=conversation_id, turn_index=turn_index)
+    if data is not None:
+        wait_for_log_growth(prev_size)
+    return data
+
+
+def check_log_file(max_entries: int = LOG_DISPLAY_ENTRIES):
+    """Check if log file exists and display its most recent entries.
+    
+    Only the last max_entries lines are parsed; earlier lines are just counted.
+    """
     log_file = Path(LOG_PATH)
     
     if not log_file.exists():
@@ -52,21 +103,27 @@ def check_log_file():
     print("\n📋 Log entries:")
     print("=" * 80)
     
-    with open(log_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-        for i, line in enumerate(lines, 1):
-            try:
-                record = json.loads(line.strip())
-                print(f"\nEntry {i}:")
-                print(f"  Timestamp: {record.get('timestamp')}")
-                print(f"  Conversation ID: {record.get('conversation_id')}")
-                print(f"  Turn Index: {record.get('turn_index')}")
-                print(f"  User Query: {record.get('user_query', '')[:60]}...")
-                print(f"  Answer Length: {len(record.get('answer', ''))} chars")
-                print(f"  Contexts: {len(record.get('contexts', []))} chunks")
-                print(f"  Chunking Strategy: {record.get('chunking_strategy')}")
-            except json.JSONDecodeError as e:
-                print(f"  ⚠️  Invalid JSON on line {i}: {e}")
+    # Stream the file, keeping only the raw lines that will be displayed
+    with open(log_file, 'rb') as f:
+        tail = deque(enumerate(f, 1), maxlen=max_entries)
+    
+    total = tail[-1][0] if tail else 0
+    if total > len(tail):
+        print(f"(showing the last {len(tail)} of {total} entries)")
+    
+    for i, line in tail:
+        try:
+            record = orjson.loads(line.strip())
+            print(f"\nEntry {i}:")
+            print(f"  Timestamp: {record.get('timestamp')}")
+            print(f"  Conversation ID: {record.get('conversation_id')}")
+            print(f"  Turn Index: {record.get('turn_index')}")
+            print(f"  User Query: {record.get('user_query', '')[:60]}...")
+            print(f"  Answer Length: {len(record.get('answer', ''))} chars")
+            print(f"  Contexts: {len(record.get('contexts', []))} chunks")
+            print(f"  Chunking Strategy: {record.get('chunking_strategy')}")
+        except orjson.JSONDecodeError as e:
+            print(f"  ⚠️  Invalid JSON on line {i}: {e}")
     
     print("=" * 80)
     return True
@@ -79,7 +136,7 @@ def main():
     
     # Check if server is running
     try:
-        response = requests.get(f"{API_BASE_URL}/api/health", timeout=5)
+        response = SESSION.get(f"{API_BASE_URL}/api/health", timeout=5)
         if response.status_code == 200:
             print("✅ Server is running")
         else:
@@ -93,28 +150,23 @@ def main():
     print("\n" + "=" * 80)
     print("Test 1: Request without conversation_id")
     print("=" * 80)
-    test_chat_request("What is artificial intelligence?")
-    time.sleep(1)  # Give server time to write log
+    chat_and_wait_for_log("What is artificial intelligence?")
     
     # Test 2: Request with conversation_id (same conversation)
     print("\n" + "=" * 80)
     print("Test 2: Request with conversation_id (same conversation)")
     print("=" * 80)
     conv_id = "test-conversation-123"
-    test_chat_request("Tell me more about machine learning.", conversation_id=conv_id, turn_index=0)
-    time.sleep(1)
-    test_chat_request("What are neural networks?", conversation_id=conv_id, turn_index=1)
-    time.sleep(1)
+    chat_and_wait_for_log("Tell me more about machine learning.", conversation_id=conv_id, turn_index=0)
+    chat_and_wait_for_log("What are neural networks?", conversation_id=conv_id, turn_index=1)
     
     # Test 3: Request with conversation_id but no turn_index (should auto-increment)
     print("\n" + "=" * 80)
     print("Test 3: Request with conversation_id but no turn_index")
     print("=" * 80)
     conv_id2 = "test-conversation-456"
-    test_chat_request("What is Python?", conversation_id=conv_id2)
-    time.sleep(1)
-    test_chat_request("What is JavaScript?", conversation_id=conv_id2)
-    time.sleep(1)
+    chat_and_wait_for_log("What is Python?", conversation_id=conv_id2)
+    chat_and_wait_for_log("What is JavaScript?", conversation_id=conv_id2)
     
     # Check log file
     print("\n" + "=" * 80)